@@ -1,8 +1,11 @@
 from jsonutils.base import JSONObject
 from jsonutils.functions.parsers import (
     parse_bool,
+    parse_bool_many,
     parse_datetime,
+    parse_datetime_many,
     parse_float,
+    parse_float_many,
     parse_http_url,
     parse_json,
     parse_timestamp,
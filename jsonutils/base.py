@@ -1,27 +1,26 @@
 """
 This module contains the base objects of the JSON structure
 """
-from functools import partial
+from functools import partial, wraps
 import json
 import multiprocessing as mp
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, time
-from pathlib import Path
 from typing import List, Union
-from uuid import uuid4
 
 import pyperclip
-import requests
 from bs4 import BeautifulSoup
 
 import jsonutils.config as config
-from jsonutils.encoders import JSONObjectEncoder
+from jsonutils.cache import memoized_method
 from jsonutils.exceptions import (
     JSONDecodeException,
     JSONNotFoundException,
     JSONQueryException,
     JSONQueryMultipleValues,
 )
+from jsonutils.functions.backends import json_dumps, json_loads
 from jsonutils.functions.decorators import dummy, global_config, return_value_on_exception
 from jsonutils.functions.external import (
     DjangoQuerySet,
@@ -36,9 +35,9 @@ from jsonutils.functions.external import (
     isPandasNAN,
 )
 from jsonutils.functions.parsers import (
+    KeyQueryPlan,
+    QueryPlan,
     _parse_html_table,
-    _parse_query,
-    _parse_query_key,
     _to_django_model,
     parse_bool,
     parse_datetime,
@@ -46,16 +45,34 @@ from jsonutils.functions.parsers import (
     parse_timestamp,
     url_validator,
 )
-from jsonutils.functions.reader import _open_multiple_files, _open_single_file
+from jsonutils.functions.reader import (
+    _AsyncOpen,
+    _iterparse_file,
+    _iterparse_ndjson,
+    _iter_ndjson_lines,
+    _open_multiple_files,
+    _open_single_file,
+)
 from jsonutils.functions.seekers import (
     _eval_object,
+    _iter_nodes,
     _json_from_path,
     _relative_to,
     _set_object,
     empty,
 )
+from jsonutils.functions.writer import _write_json, _write_ndjson
+from jsonutils.indexes import (
+    _KEY_INDEXES,
+    _in_document_order,
+    build_index,
+    create_index,
+    drop_index,
+    get_index,
+)
 from jsonutils.query import All, KeyQuerySet, ParentList, QuerySet
-from jsonutils.utils.dict import UUIDdict, ValuesDict, _rename_keys, _rename_keys_inplace
+from jsonutils.utils.dict import ChildIndex, ValuesDict, _rename_keys, _rename_keys_inplace
+from jsonutils.utils import http
 from jsonutils.utils.retry import retry_function
 
 
@@ -126,12 +143,6 @@ class JSONPath:
         jsonpath = JSONPath(result)
         return jsonpath
 
-    def _update(self, **kwargs):
-        if (key := kwargs.get("key")) is not None:
-            self._keys = (key,) + self._keys
-        elif (index := kwargs.get("index")) is not None:
-            self._keys = (index,) + self._keys
-
     def __eq__(self, other):
         if isinstance(other, (tuple, list)):
             return self._keys == tuple(other)
@@ -159,10 +170,11 @@ class JSONObject:
         "_child_objects",
         "_is_annotation",
         "_storage_path",
+        "_path_prefix",
     )
 
     def __new__(
-        cls, data=None, raise_exception=False, serialize_nodes=False
+        cls, data=None, raise_exception=False, serialize_nodes=False, lazy=False
     ) -> Union["JSONDict", "JSONList", "JSONStr", "JSONInt", "JSONFloat", "JSONNull", "JSONBool"]:
         """
         Params
@@ -172,24 +184,33 @@ class JSONObject:
         instance will be created for such a data.
         - `serialize_nodes`: if True and data represents a node instance, then take it as a raw data, discarding
         all its old node attributes (like jsonpath, parent, etc).
+        - `lazy`: if True, dict and list children will not be parsed until they are accessed for the first time
+        (by item access, iteration, queries, etc). Useful to load big documents from which only a few paths are needed.
         """
         if not isinstance(raise_exception, bool):
             raise TypeError(
                 f"raise_exception argument must be a boolean, not {type(raise_exception)}"
             )
+        # fast path for native json types, dispatched by exact type
+        builder = _NATIVE_BUILDERS.get(type(data))
+        if builder is not None:
+            return builder(data, lazy)
+
         if isinstance(data, JSONNode):
             if serialize_nodes:
-                return cls(data._data)
+                return cls(data._data, lazy=lazy)
             else:
                 return data
         elif isinstance(data, type(None)):
             return JSONNull(data)
+        elif isinstance(data, float) and data != data:  # NaN values
+            return JSONNull(None)
         elif isPandasNAN(
             data, fail_silently=True
         ):  # this must be checked before float, because np.nan is considered as float
             return JSONNull(None)
         elif isinstance(data, dict):
-            return JSONDict(data)
+            return _LazyJSONDict(data) if lazy else JSONDict(data)
         elif isinstance(data, bool):
             return JSONBool(data)
         elif isinstance(data, str):
@@ -201,7 +222,7 @@ class JSONObject:
         elif isinstance(data, int):
             return JSONInt(data)
         elif isinstance(data, (list, tuple)):
-            return JSONList(data)
+            return _LazyJSONList(data) if lazy else JSONList(data)
         # data from external libraries
         elif isinstance(data, (DjangoQuerySet(), NumpyArray(), PandasSeries())):
             return JSONList(data)
@@ -218,7 +239,14 @@ class JSONObject:
                 raise JSONDecodeException(f"Wrong data's format: {type(data)}")
 
     @classmethod
-    def open(cls, file: Union[str, List[str]], raise_exception: bool = True, **kwargs):
+    def open(
+        cls,
+        file: Union[str, List[str]],
+        raise_exception: bool = True,
+        lazy: bool = False,
+        ndjson: bool = False,
+        **kwargs,
+    ):
         """
         Open an external/s JSON file/s.
 
@@ -228,19 +256,23 @@ class JSONObject:
         If a valid url string is passed, then it will try to make a get/post request to such a target and decode a json file.
         If a list is passed, then it will load multiple JSONObjects.
         - `raise_exception`: If True, an exception will be thrown if the request is not successfull after 10 tries.
+        - `lazy`: If True, child nodes will be built only when they are accessed for the first time.
+        - `ndjson`: If True, file/s will be decoded as newline-delimited json, collecting their records into a JSONList.
+        Use `read_ndjson` to iterate over the records without loading all of them.
         """
 
         if isinstance(file, (str, os.PathLike)):
-            data, _ = _open_single_file(file, raise_exception, **kwargs)
-            return cls(data)
+            data, _ = _open_single_file(file, raise_exception, ndjson=ndjson, **kwargs)
+            return cls(data, lazy=lazy)
         elif isinstance(file, (tuple, list)):
-            data = _open_multiple_files(file, raise_exception, **kwargs)
+            data = _open_multiple_files(file, raise_exception, ndjson=ndjson, **kwargs)
             output = JSONResults()
             for elem in data:
                 obj = elem[0]
                 path = elem[1]
-                obj = cls(obj)
-                obj._storage_path = path
+                obj = cls(obj, lazy=lazy)
+                if obj.is_composed:  # singletons have no room for it
+                    obj._storage_path = path
                 output.append(obj)
             return output
 
@@ -250,17 +282,142 @@ class JSONObject:
             )
 
     @classmethod
-    def loads(cls, string, **kwargs):
+    def aopen(
+        cls,
+        file: Union[str, List[str]],
+        raise_exception: bool = True,
+        lazy: bool = False,
+        ndjson: bool = False,
+        concurrency: int = 10,
+        parse_threshold: int = 2 ** 20,
+        **kwargs,
+    ):
         """
-        This is a wrapper for json.loads. It takes a json string as argument and returns a JSONNode instance
+        Asynchronous version of `open`, for loading many files and urls concurrently.
+
+        Params
+        ------
+        - `file`: str or list of str. Specifies the file/s or url/s you want to open.
+        - `raise_exception`: If True, an exception will be thrown if the request is not successfull after 10 tries.
+        - `lazy`: If True, child nodes will be built only when they are accessed for the first time.
+        - `ndjson`: If True, file/s will be decoded as newline-delimited json.
+        - `concurrency`: maximum number of files being loaded at a time. Urls are fetched over a shared connection pool.
+        - `parse_threshold`: documents bigger than this number of bytes are decoded in a worker thread.
+
+        Awaiting the result returns a JSONObject (or a JSONResults if a list was passed, in the same order),
+        while `async for` yields the loaded JSONObjects in completion order.
+        Examples:
+        --------
+        >> results = await JSONObject.aopen(urls, concurrency=50)
+        >> async for obj in JSONObject.aopen(urls, concurrency=50):
+        ..     print(obj._storage_path)
+        """
+
+        def build(data, path):
+            obj = cls(data, lazy=lazy)
+            if obj.is_composed:
+                obj._storage_path = path
+            return obj
+
+        if isinstance(file, (str, os.PathLike)):
+            file_list = [file]
+        elif isinstance(file, (tuple, list)):
+            file_list = file
+        else:
+            raise TypeError(
+                f"`file` argument can be only of type `str` or `list`, not {type(file)}"
+            )
+        loader = _AsyncOpen(
+            file_list,
+            build,
+            raise_exception=raise_exception,
+            concurrency=concurrency,
+            parse_threshold=parse_threshold,
+            ndjson=ndjson,
+            **kwargs,
+        )
+        return _AsyncResults(loader, single=file_list is not file)
+
+    @classmethod
+    def iterparse(cls, file, path="*", lazy=False, chunk_size=2 ** 16):
+        """
+        Incrementally parse a JSON file, yielding a JSONObject for each record found at the selected path,
+        so only one record is kept in memory at a time.
+
+        Params
+        ------
+        - `file`: path or file object of the JSON file.
+        - `path`: path of the records within the document, like "data/*". A "*" item matches every key of an object
+        or index of an array. By default, it yields every item of a top-level array.
+        - `lazy`: If True, child nodes of each record will be built only when they are accessed for the first time.
+        - `chunk_size`: number of characters read from the file at a time.
+
+        Yielded dict and list records keep their jsonpath within the document, as if they were children of it,
+        but they are root objects: copies, updates and other path operations are relative to each record.
+        """
+
+        if isinstance(path, JSONPath):
+            path = path.keys
+        elif isinstance(path, str):
+            path = tuple(JSONPath._cast_to_int(i) for i in path.split("/") if i)
+        if not isinstance(path, (tuple, list)):
+            raise TypeError(
+                f"path argument must be a JSONPath, str, tuple or list instance, not {type(path)}"
+            )
+
+        for record_path, data in _iterparse_file(file, tuple(path), chunk_size=chunk_size):
+            obj = cls(data, lazy=lazy)
+            if record_path:
+                if isinstance(record_path[-1], int):
+                    obj._index = record_path[-1]
+                else:
+                    obj._key = record_path[-1]
+                if obj.is_composed:
+                    obj._path_prefix = record_path
+            yield obj
+
+    @classmethod
+    def read_ndjson(cls, file, lazy=False, raise_exception=True, **kwargs):
+        """
+        Iterate over the records of a newline-delimited json file, yielding a JSONObject for each non-empty line,
+        so only one record is kept in memory at a time.
+
+        Params
+        ------
+        - `file`: path, url or file object of the NDJSON file. Urls are requested in streaming mode.
+        - `lazy`: If True, child nodes of each record will be built only when they are accessed for the first time.
+        - `raise_exception`: If True, an exception will be thrown if the request is not successfull after 10 tries.
+
+        Yielded records keep their line index, as if they were items of a JSONList.
+        """
+
+        if not hasattr(file, "read") and url_validator(str(file)):
+            req = retry_function(
+                http.get, str(file), raise_exception=raise_exception, stream=True, **kwargs
+            )
+            records = _iter_ndjson_lines(req.iter_lines())
+        else:
+            records = _iterparse_ndjson(file)
+
+        for index, data in enumerate(records):
+            obj = cls(data, lazy=lazy)
+            obj._index = index
+            yield obj
+
+    @classmethod
+    def loads(cls, string, lazy=False, **kwargs):
+        """
+        This is a wrapper for json.loads. It takes a json string (or bytes) as argument and returns a JSONNode instance.
+        It is decoded by the backend selected in config.JSON_BACKEND, unless json.loads kwargs are passed.
+        If lazy is True, child nodes will be built only when they are accessed for the first time.
         """
 
         try:
-            data = json.loads(string, **kwargs)
+            data = json.loads(string, **kwargs) if kwargs else json_loads(string)
         except Exception as e:
             raise JSONDecodeException(f"Error when parsing the json string. Error message: {e}")
         else:
-            return cls(data)
+            return cls(data, lazy=lazy)
 
     @classmethod
     def read_from_clipboard(cls):
@@ -304,7 +461,7 @@ class JSONObject:
 
         if url_validator(data):
             try:
-                req = retry_function(requests.get, data, **kwargs)
+                req = retry_function(http.get, data, **kwargs)
             except Exception:
                 if raise_exception:
                     raise
@@ -378,54 +535,61 @@ class JSONNode:
 
     Attributes:
     -----------
-        _child_objects:
         _key: last dict parent key where the object comes from
         _index: las list parent index where the object comes from
         parent: last parent object where this object comes from
-        _id: unique uuid4 hex identifier of object
+        _id: unique identifier of object, among the living ones
     """
 
+    __slots__ = ()
     __odir__ = object.__dir__  # rename old __dir__ method to __odir__
     __osetattr__ = object.__setattr__
 
     def __init__(self, *args, **kwargs):
 
-        self._key = None
-        self._index = None
-        self.parent = None
-        self._id = uuid4().hex
-        self._child_objects = UUIDdict()
+        # a new node can't be part of any cached path, so attributes are set directly
+        self.__osetattr__("_key", None)
+        self.__osetattr__("_index", None)
+        self.__osetattr__("parent", None)
+        self.__osetattr__("_is_annotation", False)
 
-    def _set_new_uuid(self):
-
-        self._id = uuid4().hex
-        return self._id
+    @property
+    def _id(self):
+        return id(self)
 
     def json_encode(self, **kwargs):
-        return json.dumps(self, cls=JSONObjectEncoder, **kwargs)
+        return json_dumps(_encodable_data(self), **kwargs)
 
     @property
     def is_leaf(self):
         """Check if this node is a leaf node (no childs)"""
-        try:
-            child_number = self._child_objects.__len__()
-        except AttributeError:
-            return True
-        return not bool(child_number)
+        return True
 
     @property
     def json_decode(self):
-        return json.loads(json.dumps(self, cls=JSONObjectEncoder))
+        return _encodable_data(self)
 
     @property
     def jsonpath(self):
-        parent = self
-        path = JSONPath()
-        while parent is not None:
-            path._update(key=parent._key, index=parent._index)
-            parent = parent.parent
+        return JSONPath(self._path_prefix_keys + self._path_keys)
+
+    @property
+    def _path_keys(self):
+        """Tuple of keys from the root object to this node"""
+        parent = self.parent
+        path = parent._path_keys if parent is not None else ()
+        if self._key is not None:
+            return path + (self._key,)
+        elif self._index is not None:
+            return path + (self._index,)
         return path
 
+    @property
+    def _path_prefix_keys(self):
+        """Path of the root object within the document it was read from (see JSONObject.iterparse)"""
+        parent = self.parent
+        return parent._path_prefix_keys if parent is not None else ()
+
     @property
     def parent_list(self):
         pl = ParentList()
@@ -457,7 +621,7 @@ class JSONNode:
 
         is_callable = callable(new_obj)
 
-        path = self.jsonpath
+        path = self._path_keys
         root: JSONDict = self.root
 
         if is_callable:
@@ -672,6 +836,9 @@ class JSONCompose(JSONNode):
     """
 
     is_composed = True
+    # token that changes whenever the key, index or parent of any composed node is set.
+    # Path caches built under an older token are no longer valid.
+    _path_version = object()
 
     def __init__(self, *args, **kwargs):
         """
@@ -680,9 +847,108 @@ class JSONCompose(JSONNode):
         super().__init__(*args, **kwargs)
         self._assign_children()
 
+    @property
+    def _path_keys(self):
+        """
+        Tuple of keys from the root object to this node.
+        It is cached on composed nodes, and computed from the closest ancestor with a valid cache.
+        """
+        cache = self.__dict__.get("_path_cache")
+        if cache is not None and cache[0] is JSONCompose._path_version:
+            return cache[1]
+        return self._path_entry()[0]
+
+    @property
+    def _path_prefix_keys(self):
+        """Path of the root object within the document it was read from (see JSONObject.iterparse)"""
+        return self._path_entry()[1]
+
+    def _path_entry(self):
+        """(path keys, path prefix) pair of this node"""
+        version = JSONCompose._path_version
+        cache = self.__dict__.get("_path_cache")
+        if cache is not None and cache[0] is version:
+            return cache[1:]
+
+        # go upwards until a node with a valid cache (or the root) is found
+        nodes = []
+        node = self
+        while node is not None:
+            cache = node.__dict__.get("_path_cache")
+            if cache is not None and cache[0] is version:
+                path, prefix = cache[1:]
+                break
+            nodes.append(node)
+            node = node.parent
+        else:
+            path = ()
+            # a root node may come from a bigger document, and its position there is only
+            # shown by jsonpath, since paths of its nodes are relative to itself
+            prefix = nodes[-1].__dict__.get("_path_prefix")
+            if prefix is not None:
+                nodes.pop().__dict__["_path_cache"] = (version, path, prefix)
+            else:
+                prefix = ()
+
+        # then go downwards, caching the path of every node
+        for node in reversed(nodes):
+            if node._key is not None:
+                path = path + (node._key,)
+            elif node._index is not None:
+                path = path + (node._index,)
+            node.__dict__["_path_cache"] = (version, path, prefix)
+        return path, prefix
+
+    def _set_node_attribute(self, name, value):
+        """Set a reserved attribute, invalidating cached paths if the position of this node changes"""
+        if name in ("_key", "_index", "parent", "_path_prefix"):
+            # if this node has no valid path cache, neither have its descendants
+            cache = self.__dict__.get("_path_cache")
+            if cache is not None and cache[0] is JSONCompose._path_version:
+                JSONCompose._path_version = object()
+            # an indexed root which becomes a child is now indexed by its new root
+            if name == "parent" and value is not None and _KEY_INDEXES:
+                drop_index(self)
+        return object.__setattr__(self, name, value)
+
+    @property
+    def _child_objects(self):
+        """Child nodes of this object, indexed by their ids"""
+        return ChildIndex(self)
+
+    @property
+    def is_leaf(self):
+        """Check if this node is a leaf node (no childs)"""
+        return not self.__len__()
+
     @property
     def _data(self):
-        return super().json_decode
+        """Native python data of this node, as a new object which can be modified"""
+        return _copy_native(self._native)
+
+    @property
+    def _native(self):
+        """
+        Native python data of this node, for internal readers like the encoders.
+        It is cached on every composed node until the node or any of its descendants is modified,
+        so the returned object is shared between calls and must not be modified.
+        """
+        data = self.__dict__.get("_data_cache")
+        if data is None:
+            data = _native_data(self)
+        return data
+
+    @property
+    def json_decode(self):
+        """Native python data of this node, as a new object"""
+        return _native_data(self, use_cache=False)
+
+    def _invalidate_data(self):
+        """Remove the cached native data of this node and its ancestors"""
+        node = self
+        # a node without cache can't have ancestors with cache, so we can stop there
+        while node is not None and node.__dict__.pop("_data_cache", None) is not None:
+            node = node.parent
 
     def _assign_children(self):
         """Any JSON object can be a child for a given compose object"""
@@ -696,8 +962,16 @@ class JSONCompose(JSONNode):
 
     @global_config(native_types=False)
     def copy(self):
-        current_path = self.jsonpath.keys
-        root_obj = JSONObject(self.root, serialize_nodes=True)
+        """
+        Returns a copy of this node, within a copy of its root object.
+        The copy is built lazily over the (cached) native data of the root, so it shares
+        all unmodified data with the original, and only the accessed nodes are built.
+        Shared data is never modified: nodes replace it instead, and it is copied by `_data`.
+        """
+        current_path = self._path_keys
+        data = self.root._native
+        root_obj = JSONObject(data, lazy=True)
+        root_obj.__dict__["_data_cache"] = data
         obj = root_obj.eval_path(current_path)
         return obj
 
@@ -768,8 +1042,6 @@ class JSONCompose(JSONNode):
                 f"Argument stop_at_match_ must be an integer or NoneType, not {type(stop_at_match_)}"
             )
 
-        # within a particular parent node, each child in _child_objects registry must have a unique key
-
         # ---- DYNAMIC CONFIG ----
         if recursive_ is None:
             recursive_ = config.RECURSIVE_QUERIES
@@ -778,28 +1050,46 @@ class JSONCompose(JSONNode):
         if native_types_ is None:
             native_types_ = config.NATIVE_TYPES
         # ------------------------
-        queryset = QuerySet()
+        return self._query_plan(
+            QueryPlan(q),
+            recursive_=recursive_,
+            include_parent_=include_parent_,
+            stop_at_match_=stop_at_match_,
+            native_types_=native_types_,
+        )
+
+    def _query_plan(
+        self,
+        plan,
+        recursive_,
+        include_parent_,
+        stop_at_match_,
+        native_types_,
+        queryset_class=QuerySet,
+    ):
+        """Send a compiled query (a QueryPlan instance) to the children of this node"""
+
+        queryset = queryset_class()
         if native_types_:
             queryset._native_types = True
         queryset._root = self  # the node which sends the query
-        children = self._child_objects.values()
-        for child in children:
+        # if the root document is indexed, only the nodes with a matching key are visited
+        index = get_index(self)
+        candidates = index.candidates(plan) if index is not None else None
+        if candidates is not None:
+            matches = _in_document_order(
+                self, [node for node in candidates if plan.match(node)], recursive=recursive_
+            )
+            for child in matches[: stop_at_match_ or None]:
+                queryset.append(child.parent if include_parent_ else child)
+            return queryset
+
+        for child in _iter_nodes(self, recursive=recursive_):
             # if child satisfies query request, it will be appended to the queryset object
-            check, obj = _parse_query(child, include_parent_, **q)
-            if check:
-                queryset.append(obj)
-                if stop_at_match_ and queryset.count() >= stop_at_match_:
-                    return queryset
-
-            # if child is also a compose object, it will send the same query to its children recursively
-            if child.is_composed and recursive_:
-                queryset += child.query(
-                    recursive_=recursive_,
-                    include_parent_=include_parent_,
-                    stop_at_match_=stop_at_match_,
-                    native_types_=native_types_,
-                    **q,
-                )
+            if plan.match(child):
+                queryset.append(child.parent if include_parent_ else child)
+                if stop_at_match_ and len(queryset) >= stop_at_match_:
+                    break
         return queryset
 
     def get(
@@ -845,6 +1135,31 @@ class JSONCompose(JSONNode):
         else:
             return query.first()
 
+    def build_index(self):
+        """
+        Build an inverted index of the keys of the root document of this node, so that queries
+        (query, get, query_key, get_key) only visit the nodes with a matching key.
+        The index is kept up to date when children are set or removed.
+        """
+        build_index(self)
+        return self
+
+    def create_index(self, key, kind="sorted"):
+        """
+        Index the values of the nodes with this key in the root document of this node, so that queries
+        only check the nodes whose value may match their lookups on that key.
+        A "sorted" index answers gt, gte, lt, lte and exact lookups by bisection over the normalised
+        values (numbers, parsed datetimes and strings). A "hash" index answers exact and in lookups.
+        The key index of the root document is built if needed.
+        """
+        create_index(self, key, kind=kind)
+        return self
+
+    def drop_index(self):
+        """Remove the key index, and the value indexes, of the root document of this node"""
+        drop_index(self)
+        return self
+
     def annotate(self, **kwargs):
         """
         Annotate key:value pairs in each dict's child.
@@ -897,25 +1212,19 @@ class JSONCompose(JSONNode):
             }
         """
 
-        if isinstance(self, JSONDict):
-            _registered_keys = set()
+        # composed nodes are collected before annotating, so annotated values are not visited
+        composed_nodes = [self] + [ch for ch in _iter_nodes(self) if ch.is_composed]
+        for node in composed_nodes:
+            if not isinstance(node, JSONDict):
+                continue
             for key, value in kwargs.items():
                 # if key from annotation is not in dict keys, register it
-                if key not in self.keys():
+                if key not in node.keys():
                     child = JSONObject(value)
                     child._key = key
-                    child.parent = self
+                    child.parent = node
                     child._is_annotation = True
-                    self.__setitem__(key, child)
-                    _registered_keys.add(child._id)
-
-            for ch in self._child_objects.values_except(_registered_keys):
-                if ch.is_composed:
-                    ch.annotate(**kwargs)
-        elif isinstance(self, JSONList):
-            for ch in self._child_objects.values():
-                if ch.is_composed:
-                    ch.annotate(**kwargs)
+                    node.__setitem__(key, child)
         return self
 
     def query_key(
@@ -933,8 +1242,6 @@ class JSONCompose(JSONNode):
                 f"Argument stop_at_match_ must be an integer or NoneType, not {type(stop_at_match_)}"
             )
 
-        # within a particular parent node, each child in _child_objects registry must have a unique key
-
         # ---- DYNAMIC CONFIG ----
         if recursive_ is None:
             recursive_ = config.RECURSIVE_QUERIES
@@ -943,30 +1250,14 @@ class JSONCompose(JSONNode):
         if native_types_ is None:
             native_types_ = config.NATIVE_TYPES
         # ------------------------
-        queryset = KeyQuerySet()
-        if native_types_:
-            queryset._native_types = True
-        queryset._root = self  # the node which sends the query
-        children = self._child_objects.values()
-        for child in children:
-            # if child satisfies query request, it will be appended to the queryset object
-            check, obj = _parse_query_key(child, pattern, include_parent_, **q)
-            if check:
-                queryset.append(obj)
-                if stop_at_match_ and queryset.count() >= stop_at_match_:
-                    return queryset
-
-            # if child is also a compose object, it will send the same query to its children recursively
-            if child.is_composed and recursive_:
-                queryset += child.query_key(
-                    pattern,
-                    recursive_=recursive_,
-                    include_parent_=include_parent_,
-                    stop_at_match_=stop_at_match_,
-                    native_types_=native_types_,
-                    **q,
-                )
-        return queryset
+        return self._query_plan(
+            KeyQueryPlan(pattern, q),
+            recursive_=recursive_,
+            include_parent_=include_parent_,
+            stop_at_match_=stop_at_match_,
+            native_types_=native_types_,
+            queryset_class=KeyQuerySet,
+        )
 
     def get_key(
         self,
@@ -1016,7 +1307,7 @@ class JSONCompose(JSONNode):
 
         if isinstance(self, JSONDict):
             for key, value in list(self.items()):
-                if "_is_annotation" in value.__odir__():
+                if value._is_annotation is True:
                     self.pop(key)
                 if value.is_composed and recursive:
                     value._remove_annotations()
@@ -1072,12 +1363,9 @@ class JSONCompose(JSONNode):
 
         output_list = QuerySet()
 
-        children = self._child_objects.values()
-        for child in children:
+        for child in _iter_nodes(self):
             serialized_child = child._data
             output_list.append(JSONObject({"path": child.jsonpath.keys, "value": serialized_child}))
-            if child.is_composed:
-                output_list += child.traverse_json()
 
         return output_list
 
@@ -1111,13 +1399,9 @@ class JSONCompose(JSONNode):
         """
         output_dict = {}
 
-        children = self._child_objects.values()
-        for child in children:
+        for child in _iter_nodes(self):
             if child.is_leaf:
-                serialized_child = child._data
-                output_dict[child.jsonpath.keys] = serialized_child
-            if child.is_composed:
-                output_dict.update(child.to_path())
+                output_dict[child.jsonpath.keys] = child._data
 
         return output_dict
 
@@ -1139,7 +1423,19 @@ class JSONCompose(JSONNode):
 
         return _validate_data(self, schema)
 
-    def save(self, path, create_path=True, ensure_ascii=False, indent=4, **kwargs):
+    def save(
+        self,
+        path,
+        create_path=True,
+        ensure_ascii=False,
+        indent=4,
+        ndjson=False,
+        append=False,
+        chunk_size=1000,
+        compression="infer",
+        compact=False,
+        **kwargs,
+    ):
         """
         Save the JSON Composed object to a file.
         Arguments
@@ -1147,23 +1443,46 @@ class JSONCompose(JSONNode):
             path: full path where to store the output file
             create_path: if True, then path to file will be created if doesn't exist
             ensure_ascii: if you want to handle unicode values
-            indent: number of indents (default 4)
+            indent: number of indents (default 4). Ignored for NDJSON files
+            ndjson: if True, write a newline-delimited json file: one line per item of a JSONList,
+                or a single line for a JSONDict
+            append: if True, append the records to an existing NDJSON file instead of overwriting it
+            chunk_size: number of NDJSON records encoded and written at a time
+            compression: "gzip", "bz2", "xz", "zstd" or None. By default, it is inferred from the
+                path extension (.gz, .bz2, .xz or .zst). The output is compressed as a stream
+            compact: if True, write the json without any whitespace (indent is ignored), which is
+                the fastest format to encode
+        The output is written to a temporary file, which replaces path once it is complete.
         """
-        _path = Path(path).resolve()
-
-        if create_path is True:
-            _path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(path, "w") as file:
-            json.dump(
+        if compact:
+            indent = None
+            kwargs.setdefault("separators", (",", ":"))
+        if not ndjson:
+            if append:
+                raise ValueError("Only NDJSON files can be appended to")
+            return _write_json(
                 self,
-                file,
-                cls=JSONObjectEncoder,
+                path,
+                create_path=create_path,
                 ensure_ascii=ensure_ascii,
                 indent=indent,
+                compression=compression,
                 **kwargs,
             )
 
+        records = self if isinstance(self, JSONList) else (self,)
+        _write_ndjson(
+            records,
+            path,
+            append=append,
+            create_path=create_path,
+            ensure_ascii=ensure_ascii,
+            chunk_size=chunk_size,
+            compression=compression,
+            **kwargs,
+        )
+
     def merge(self, other, kind="inner_join"):
         """
         Makes a JSON merge with other JSON object
@@ -1200,8 +1519,10 @@ class JSONSingleton(JSONNode):
     This is the base class for JSON singleton objects.
     A singleton object has no children
     Singleton object might be: JSONStr, JSONFloat, JSONInt, JSONBool, JSONNull.
+    Singleton objects store their attributes in slots, instead of in an instance dict.
     """
 
+    __slots__ = ()
     is_composed = False
 
     def query(self, **kwargs):
@@ -1215,6 +1536,8 @@ class JSONSingleton(JSONNode):
         return JSONNull(None)
 
     def __getattr__(self, name):
+        if name.startswith("__") and name.endswith("__"):  # special methods (e.g. pickling ones)
+            raise AttributeError(name)
         if config.NATIVE_TYPES:
             return
         return JSONNull(None)
@@ -1268,6 +1591,8 @@ class JSONDict(dict, JSONCompose):
                 return _rename_keys(self, kwargs)
 
     def __getattr__(self, name):
+        if name.startswith("__") and name.endswith("__"):  # special methods (e.g. pickling ones)
+            raise AttributeError(name)
         try:
             return self.__getitem__(name)
         except KeyError:  # if a key error is thrown, then it will call __dir__
@@ -1276,37 +1601,34 @@ class JSONDict(dict, JSONCompose):
             return JSONNull(None)
 
     def __setitem__(self, k, v):
-        """
-        When setting a new child, we must follow this steps:
-            1 - Initialize child
-            2 - Remove old child item from _child_objects dictionary
-            3 - Assign new child item to _child_objects dictionary
-        """
+        """When setting a new child, it must be initialized and linked to this node"""
 
         # ---- initalize child ----
         child = JSONObject(v)
         child._key = k
         child.parent = self
 
-        # ---- remove old child ----
-        prev_child = super().get(k)  # old child (maybe None)
-        try:
-            self._child_objects.pop(
-                prev_child._id, None
-            )  # we must remove current child item. If not, it would still appear in queries
-        except AttributeError:
-            pass
+        index = get_index(self) if _KEY_INDEXES else None
+        if index is None:
+            return super().__setitem__(k, child)
 
-        # ---- assign new child ----
-        self._child_objects[child._id] = child
+        old = dict.get(self, k)
+        if isinstance(old, JSONNode) and old is not child:
+            index.remove(old)
+        super().__setitem__(k, child)
+        index.add(child)
 
-        return super().__setitem__(k, child)
+    def __delitem__(self, k):
+        index = get_index(self) if _KEY_INDEXES else None
+        if index is not None and isinstance(dict.get(self, k), JSONNode):
+            index.remove(dict.__getitem__(self, k))
+        return super().__delitem__(k)
 
     def __setattr__(self, name, value):
         """To define behaviour when setting an atributte. It must register a new node if not a reserved keyword"""
 
         if name in JSONObject._RESERVED_ATTRIBUTES:
-            return super().__setattr__(name, value)
+            return self._set_node_attribute(name, value)
         else:
             return self.__setitem__(name, value)
 
@@ -1339,13 +1661,12 @@ class JSONDict(dict, JSONCompose):
 
     def pop(self, key, default=_DEFAULT):
         """
-        When removing a key from dict, we also must unregister the corresponding child
-        from _child_objects dictionary
+        Remove a key from dict and return the corresponding child.
+        If key is not found, default is returned if given, otherwise KeyError is raised.
         """
         if key in self or default is self._DEFAULT:
             child = self[key]  # getting the child
             del self[key]
-            self._child_objects.pop(child._id, None)  # unregister child
             return child
         else:
             return default
@@ -1424,8 +1745,10 @@ class JSONList(list, JSONCompose):
         child._index = self.__len__()
         child.parent = self
 
-        self._child_objects[child._id] = child
-        return super().append(child)
+        super().append(child)
+        index = get_index(self) if _KEY_INDEXES else None
+        if index is not None:
+            index.add(child)
 
     def length(self):
         return self.__len__()
@@ -1448,7 +1771,7 @@ class JSONList(list, JSONCompose):
         """To define behaviour when setting an atributte. It must register a new node if not a reserved keyword"""
 
         if name in JSONObject._RESERVED_ATTRIBUTES:
-            return super().__setattr__(name, value)
+            return self._set_node_attribute(name, value)
         else:
             name = int(name.replace("_", ""))
             return self.__setitem__(name, value)
@@ -1460,17 +1783,19 @@ class JSONList(list, JSONCompose):
         child._index = index
         child.parent = self
 
-        # ---- remove old child ----
-        prev_child = super().__getitem__(index)
-        try:
-            self._child_objects.pop(prev_child._id, None)
-        except AttributeError:
-            pass
+        key_index = get_index(self) if _KEY_INDEXES else None
+        if key_index is None:
+            return super().__setitem__(index, child)
 
-        # ---- assign new child ----
-        self._child_objects[child._id] = child
-
-        return super().__setitem__(index, child)
+        if isinstance(index, slice):
+            key_index.stale = True
+        else:
+            old = list.__getitem__(self, index)
+            if isinstance(old, JSONNode) and old is not child:
+                key_index.remove(old)
+        super().__setitem__(index, child)
+        if not key_index.stale:
+            key_index.add(child)
 
     # ---- COMPARISON METHODS ----
     def __eq__(self, other):
@@ -1505,14 +1830,360 @@ class JSONList(list, JSONCompose):
             return result
 
 
+def _invalidating(method):
+    """Wrap a mutating method, so the cached native data of the node and its ancestors is removed first"""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._invalidate_data()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _name in ("__setitem__", "__delitem__", "popitem", "clear", "update", "setdefault"):
+    setattr(JSONDict, _name, _invalidating(getattr(JSONDict, _name)))
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(JSONList, _name, _invalidating(getattr(JSONList, _name)))
+
+
+def _unindexing(method):
+    """Wrap a mutating method which is not tracked by key indexes, so the index of its root is rebuilt later"""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        index = get_index(self) if _KEY_INDEXES else None
+        if index is not None:
+            index.stale = True
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _name in ("popitem", "clear", "update", "setdefault"):
+    setattr(JSONDict, _name, _unindexing(getattr(JSONDict, _name)))
+
+for _name in ("__delitem__", "__iadd__", "__imul__", "extend", "insert", "pop", "remove", "clear"):
+    setattr(JSONList, _name, _unindexing(getattr(JSONList, _name)))
+
+
+def _json_key(key):
+    """Convert a dict key to str, as the json encoder does"""
+    if isinstance(key, str):
+        return key
+    elif key is True:
+        return "true"
+    elif key is False:
+        return "false"
+    elif key is None:
+        return "null"
+    elif isinstance(key, float):
+        if key != key:
+            return "NaN"
+        elif key in (float("inf"), float("-inf")):
+            return "Infinity" if key > 0 else "-Infinity"
+        return float.__repr__(key)
+    elif isinstance(key, int):
+        return int.__repr__(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def _native_data(node, use_cache=True):
+    """
+    Build the native python data (dicts, lists and scalars) of a composed node, without encoding it to text.
+    The result is the same as a json round trip. Traversal is done with an explicit stack.
+    If use_cache is True, native data of composed nodes is reused from, and stored in, their cache.
+    """
+
+    def items(obj):
+        if isinstance(obj, dict):
+            return ((k if k.__class__ is str else _json_key(k), v) for k, v in obj.items())
+        return ((None, v) for v in obj)
+
+    leaf_data = _LEAF_DATA
+    output = {} if isinstance(node, dict) else []
+    stack = [(node, output, items(node))]
+    active = {id(node)}  # composed nodes being built, to detect circular references
+    while stack:
+        parent, container, children = stack[-1]
+        for key, child in children:
+            leaf = leaf_data.get(child.__class__)
+            if leaf is not None:
+                data = leaf(child)
+            elif isinstance(child, JSONCompose):
+                data = child.__dict__.get("_data_cache") if use_cache else None
+                if data is None:
+                    if id(child) in active:
+                        raise ValueError("Circular reference detected")
+                    data = {} if isinstance(child, dict) else []
+                    stack.append((child, data, items(child)))
+                    active.add(id(child))
+            elif isinstance(child, JSONNode):
+                data = child._data
+            else:  # raw data added by non-parsing methods (like extend)
+                data = _native_data(JSONList((child,)), use_cache=False)[0]
+
+            if key is None:
+                container.append(data)
+            else:
+                container[key] = data
+            if stack[-1][0] is child:  # go on with the children of this child
+                break
+        else:
+            stack.pop()
+            active.discard(id(parent))
+            if use_cache:
+                parent.__dict__["_data_cache"] = container
+    return output
+
+
+def _copy_native(data):
+    """Copy the dicts and lists of native data, so the copy can be modified without changing data"""
+
+    if data.__class__ is dict:
+        output = {}
+    elif data.__class__ is list:
+        output = []
+    else:
+        return data
+    stack = [(data, output)]
+    while stack:
+        source, target = stack.pop()
+        is_dict = source.__class__ is dict
+        for key, value in source.items() if is_dict else enumerate(source):
+            if value.__class__ is dict or value.__class__ is list:
+                copy = {} if value.__class__ is dict else []
+                stack.append((value, copy))
+                value = copy
+            if is_dict:
+                target[key] = value
+            else:
+                target.append(value)
+    return output
+
+
+def _encodable_data(obj, use_cache=True):
+    """
+    Native python data of a node, or of a list of nodes (like a queryset), which can be encoded
+    without any per-object callback. Raw values are parsed first.
+    The data of composed nodes is their cached native data, which must not be modified.
+    If use_cache is False, data which is not cached yet is built without caching it.
+    """
+
+    if isinstance(obj, JSONCompose):
+        if use_cache:
+            return obj._native
+        data = obj.__dict__.get("_data_cache")
+        return data if data is not None else _native_data(obj, use_cache=False)
+    leaf = _LEAF_DATA.get(obj.__class__)
+    if leaf is not None:
+        return leaf(obj)
+    if isinstance(obj, QuerySet):
+        return [_encodable_data(i, use_cache) for i in obj]
+    return _native_data(JSONList((obj,)), use_cache=False)[0]
+
+
+# ---- LAZY COMPOSE OBJECTS ----
+class _LazyJSONDict(JSONDict):
+    """
+    A dict object whose children are stored as raw data until they are needed.
+    A child accessed by its key is parsed (lazily too) on its own. The first time
+    children are iterated, queried or modified, all of them are parsed and
+    the instance becomes a regular JSONDict.
+    """
+
+    def __init__(self, *args, **kwargs):
+
+        dict.__init__(self, *args, **kwargs)
+        JSONNode.__init__(self)
+
+    @property
+    def _child_objects(self):
+        self._materialize()
+        return self._child_objects
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, JSONNode) and value.parent is self:  # already parsed
+            return value
+        child = _lazy_child(self, value, key=key)
+        dict.__setitem__(self, key, child)
+        return child
+
+    def _materialize(self):
+        """Parse the raw children of this dict and turn it into a regular JSONDict"""
+
+        self.__osetattr__("__class__", JSONDict)
+        for key, value in dict.items(self):
+            if not (isinstance(value, JSONNode) and value.parent is self):
+                dict.__setitem__(self, key, _lazy_child(self, value, key=key))
+
+
+class _LazyJSONList(JSONList):
+    """
+    A list object whose children are stored as raw data until they are needed.
+    A child accessed by its index is parsed (lazily too) on its own. The first time
+    children are iterated, queried or modified, all of them are parsed and
+    the instance becomes a regular JSONList.
+    """
+
+    def __init__(self, *args, **kwargs):
+
+        list.__init__(self, *args, **kwargs)
+        JSONNode.__init__(self)
+
+    @property
+    def _child_objects(self):
+        self._materialize()
+        return self._child_objects
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            self._materialize()
+            return list.__getitem__(self, index)
+
+        value = list.__getitem__(self, index)
+        if isinstance(value, JSONNode) and value.parent is self:  # already parsed
+            return value
+        if index < 0:
+            index += list.__len__(self)
+        child = _lazy_child(self, value, index=index)
+        list.__setitem__(self, index, child)
+        return child
+
+    def _materialize(self):
+        """Parse the raw children of this list and turn it into a regular JSONList"""
+
+        self.__osetattr__("__class__", JSONList)
+        for index, item in enumerate(list.__iter__(self)):
+            if not (isinstance(item, JSONNode) and item.parent is self):
+                list.__setitem__(self, index, _lazy_child(self, item, index=index))
+
+
+def _lazy_child(parent, value, key=None, index=None):
+    """Build a lazy child node of a lazy object from its raw data"""
+
+    child = JSONObject(value, lazy=True)
+    if key is not None:
+        child._key = key
+    else:
+        child._index = index
+    child.parent = parent
+    # if parent's raw data is its cached native data, then raw value is also the native data of child
+    if (
+        child.is_composed
+        and child is not value
+        and parent.__dict__.get("_data_cache") is not None
+    ):
+        child.__dict__["_data_cache"] = value
+    return child
+
+
+def _materializing(name):
+    """Build a method which parses the children of a lazy object before calling the regular one"""
+
+    def method(self, *args, **kwargs):
+        self._materialize()
+        return getattr(self, name)(*args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+for _name in (
+    "__setitem__",
+    "__eq__",
+    "__ne__",
+    "__repr__",
+    "items",
+    "_get",
+    "setdefault",
+    "update",
+    "popitem",
+    "__reduce_ex__",
+):
+    setattr(_LazyJSONDict, _name, _materializing(_name))
+
+for _name in (
+    "__setitem__",
+    "__iter__",
+    "__reversed__",
+    "__contains__",
+    "__eq__",
+    "__ne__",
+    "__gt__",
+    "__ge__",
+    "__lt__",
+    "__le__",
+    "__repr__",
+    "__add__",
+    "__iadd__",
+    "__mul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "index",
+    "count",
+    "sort",
+    "__reduce_ex__",
+):
+    setattr(_LazyJSONList, _name, _materializing(_name))
+
+del _name
+
+
 # ---- SINGLETON OBJECTS ----
+def _to_float(value, **kwargs):
+    """parse_float, using the parsed values cache of value if it is a JSONStr"""
+    if isinstance(value, JSONStr):
+        return value.to_float(**kwargs)
+    return parse_float(value, **kwargs)
+
+
+def _to_datetime(value, **kwargs):
+    """parse_datetime, using the parsed values cache of value if it is a JSONStr"""
+    if isinstance(value, JSONStr):
+        return value.to_datetime(**kwargs)
+    return parse_datetime(value, **kwargs)
+
+
 class JSONStr(str, JSONSingleton):
-    def __new__(cls, string):
-        obj = super().__new__(cls, string)
-        obj._data = str(string)
-        return obj
+
+    # _cache holds the values parsed from the string (see memoized_method)
+    __slots__ = ("_key", "_index", "parent", "_is_annotation", "_cache")
+
+    @property
+    def _data(self):
+        return str.__str__(self)
+
+    def __getstate__(self):
+        """Parsed values are not pickled, they are parsed again if needed"""
+        state = {}
+        for name in ("_key", "_index", "parent", "_is_annotation"):
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        return None, state
 
     # converters
+    @memoized_method
     def to_float(self, **kwargs):
         """
         Try to parse a python float64 from self string.
@@ -1527,21 +2198,30 @@ class JSONStr(str, JSONSingleton):
 
         return parse_float(self, **kwargs)
 
+    @memoized_method
     def to_datetime(self, **kwargs):
         """Try to parse an aware datetime object from self string"""
 
         return parse_datetime(self, **kwargs)
 
+    @memoized_method
     def to_timestamp(self, **kwargs):
         """Try to parse a POSIX timestamp string from self string"""
 
         return parse_timestamp(self, **kwargs)
 
+    @memoized_method
     def to_bool(self):
         """Trye to parse a bool object from self string."""
 
         return parse_bool(self)
 
+    @memoized_method
+    def is_url(self, **kwargs):
+        """Check if self string is a valid url"""
+
+        return bool(url_validator(self, **kwargs))
+
     def __hash__(self):
         return super().__hash__()
 
@@ -1564,14 +2244,14 @@ class JSONStr(str, JSONSingleton):
         # if target_value is a datetime
         elif isinstance(other, (date, datetime)):
             try:
-                return self.to_datetime() == parse_datetime(other)
+                return self.to_datetime() == _to_datetime(other)
             except Exception:
                 return False
         # if target_value is a str
         elif isinstance(other, str):
-            if parse_datetime(other, only_check=True):  # if target value is a datetime string
+            if _to_datetime(other, only_check=True):  # if target value is a datetime string
                 try:
-                    return self.to_datetime() == parse_datetime(other)
+                    return self.to_datetime() == _to_datetime(other)
                 except Exception:
                     return False
             else:
@@ -1595,14 +2275,14 @@ class JSONStr(str, JSONSingleton):
         # if target_value is a datetime
         elif isinstance(other, datetime):
             try:
-                return self.to_datetime() > parse_datetime(other)
+                return self.to_datetime() > _to_datetime(other)
             except Exception:
                 return False
         # if target_value is a str
         elif isinstance(other, str):
-            if parse_datetime(other, only_check=True):  # if target value is a datetime string
+            if _to_datetime(other, only_check=True):  # if target value is a datetime string
                 try:
-                    return self.to_datetime() > parse_datetime(other)
+                    return self.to_datetime() > _to_datetime(other)
                 except Exception:
                     return False
             else:
@@ -1626,14 +2306,14 @@ class JSONStr(str, JSONSingleton):
         # if target_value is a datetime
         elif isinstance(other, datetime):
             try:
-                return self.to_datetime() >= parse_datetime(other)
+                return self.to_datetime() >= _to_datetime(other)
             except Exception:
                 return False
         # if target_value is a str
         elif isinstance(other, str):
-            if parse_datetime(other, only_check=True):  # if target value is a datetime string
+            if _to_datetime(other, only_check=True):  # if target value is a datetime string
                 try:
-                    return self.to_datetime() >= parse_datetime(other)
+                    return self.to_datetime() >= _to_datetime(other)
                 except Exception:
                     return False
             else:
@@ -1657,14 +2337,14 @@ class JSONStr(str, JSONSingleton):
         # if target_value is a datetime
         elif isinstance(other, datetime):
             try:
-                return self.to_datetime() < parse_datetime(other)
+                return self.to_datetime() < _to_datetime(other)
             except Exception:
                 return False
         # if target_value is a str
         elif isinstance(other, str):
-            if parse_datetime(other, only_check=True):  # if target value is a datetime string
+            if _to_datetime(other, only_check=True):  # if target value is a datetime string
                 try:
-                    return self.to_datetime() < parse_datetime(other)
+                    return self.to_datetime() < _to_datetime(other)
                 except Exception:
                     return False
             else:
@@ -1688,14 +2368,14 @@ class JSONStr(str, JSONSingleton):
         # if target_value is a datetime
         elif isinstance(other, datetime):
             try:
-                return self.to_datetime() <= parse_datetime(other)
+                return self.to_datetime() <= _to_datetime(other)
             except Exception:
                 return False
         # if target_value is a str
         elif isinstance(other, str):
-            if parse_datetime(other, only_check=True):  # if target value is a datetime string
+            if _to_datetime(other, only_check=True):  # if target value is a datetime string
                 try:
-                    return self.to_datetime() <= parse_datetime(other)
+                    return self.to_datetime() <= _to_datetime(other)
                 except Exception:
                     return False
             else:
@@ -1709,86 +2389,93 @@ class JSONStr(str, JSONSingleton):
 
 
 class JSONFloat(float, JSONSingleton):
-    def __new__(cls, fl):
-        obj = super().__new__(cls, fl)
-        obj._data = float(fl)
-        return obj
+
+    __slots__ = ("_key", "_index", "parent", "_is_annotation")
+
+    @property
+    def _data(self):
+        return float.__float__(self)
 
     def __hash__(self):
         return super().__hash__()
 
     def __eq__(self, other):
         try:
-            return super().__eq__(parse_float(other))
+            return super().__eq__(_to_float(other))
         except Exception:
             return False
 
     def __gt__(self, other):
         try:
-            return super().__gt__(parse_float(other))
+            return super().__gt__(_to_float(other))
         except Exception:
             return False
 
     def __ge__(self, other):
         try:
-            return super().__ge__(parse_float(other))
+            return super().__ge__(_to_float(other))
         except Exception:
             return False
 
     def __lt__(self, other):
         try:
-            return super().__lt__(parse_float(other))
+            return super().__lt__(_to_float(other))
         except Exception:
             return False
 
     def __le__(self, other):
         try:
-            return super().__le__(parse_float(other))
+            return super().__le__(_to_float(other))
         except Exception:
             return False
 
 
 class JSONInt(int, JSONSingleton):
-    def __new__(cls, i):
-        obj = super().__new__(cls, i)
-        obj._data = int(i)
-        return obj
+
+    # int subtypes do not support nonempty slots, so attributes are stored in the instance dict
+
+    @property
+    def _data(self):
+        return int.__int__(self)
 
     def __hash__(self):
         return super().__hash__()
 
     def __eq__(self, other):
         try:
-            return super().__float__().__eq__(parse_float(other))
+            return super().__float__().__eq__(_to_float(other))
         except Exception:
             return False
 
     def __gt__(self, other):
         try:
-            return super().__float__().__gt__(parse_float(other))
+            return super().__float__().__gt__(_to_float(other))
         except Exception:
             return False
 
     def __ge__(self, other):
         try:
-            return super().__float__().__ge__(parse_float(other))
+            return super().__float__().__ge__(_to_float(other))
         except Exception:
             return False
 
     def __lt__(self, other):
         try:
-            return super().__float__().__lt__(parse_float(other))
+            return super().__float__().__lt__(_to_float(other))
         except Exception:
             return False
 
     def __le__(self, other):
         try:
-            return super().__float__().__le__(parse_float(other))
+            return super().__float__().__le__(_to_float(other))
         except Exception:
             return False
 
 
 class JSONBool(JSONSingleton):
+
+    __slots__ = ("_key", "_index", "parent", "_is_annotation", "_data")
+
     def __init__(self, data):
 
         if not isinstance(data, bool):
@@ -1832,6 +2519,9 @@ class JSONBool(JSONSingleton):
 
 
 class JSONNull(JSONSingleton):
+
+    __slots__ = ("_key", "_index", "parent", "_is_annotation", "_data")
+
     def __init__(self, data):
 
         if not isinstance(data, type(None)):
@@ -1876,6 +2566,8 @@ class JSONNull(JSONSingleton):
 class JSONUnknown(JSONSingleton):
     """Unknown object"""
 
+    __slots__ = ("_key", "_index", "parent", "_is_annotation", "_data", "_type")
+
     def __init__(self, data):
         super().__init__()
         self._data = data
@@ -1904,16 +2596,276 @@ class JSONUnknown(JSONSingleton):
 
 
 class JSONResults(list):
-    def save(self):
-        [obj.save(obj._storage_path) for obj in self]
+    """
+    A list of JSONObjects, as returned when opening multiple files.
+    Queries can be run in parallel by a set of long-lived worker processes (see `start_workers`),
+    each of which keeps a shard of the documents resident in memory.
+    """
+
+    _workers = None
+
+    def save(self, max_workers=None, **kwargs):
+        """
+        Save every document to the file it was opened from. Documents are encoded and written
+        by a pool of `max_workers` threads. Extra kwargs are passed to the save method of each document.
+        """
+
+        if max_workers == 1:
+            for obj in self:
+                obj.save(obj._storage_path, **kwargs)
+            return
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = [executor.submit(obj.save, obj._storage_path, **kwargs) for obj in self]
+        for future in futures:
+            future.result()
+
+    def start_workers(self, processes=None):
+        """
+        Start the worker processes and send them the documents, which will stay loaded in them.
+        A document modified afterwards is sent again by the next query.
+        It returns self, so it can be used as a context manager which stops the workers on exit:
+        >> with results.start_workers(4):
+        ..     for value in values:
+        ..         results.query(A=value)
+        """
+
+        self.stop_workers()
+        processes = min(processes or os.cpu_count() or 1, max(len(self), 1))
+        workers = []
+        for _ in range(processes):
+            connection, worker_connection = mp.Pipe()
+            process = mp.Process(target=_results_worker, args=(worker_connection,), daemon=True)
+            process.start()
+            worker_connection.close()
+            workers.append((process, connection))
+        self._workers = workers
+        self._shipped = {}  # document index -> (document, native data) loaded in its worker
+        self._ship_documents()
+        return self
+
+    def stop_workers(self):
+        """Stop the worker processes, if they are running"""
+
+        workers, self._workers = self._workers, None
+        for process, connection in workers or ():
+            try:
+                connection.send(("stop", None))
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+            process.join()
+
+    def _ship_documents(self):
+        """
+        Send to the workers the documents which they don't have yet, or which have been modified
+        or replaced, and unload the documents which have been removed
+        """
+
+        workers = self._workers
+        batches = [[] for _ in workers]
+        for index, document in enumerate(self):
+            shipped_document, shipped_data = self._shipped.get(index, (None, None))
+            if document is shipped_document:
+                if not document.is_composed:  # singletons can't be modified
+                    continue
+                data = document.__dict__.get("_data_cache")
+                if data is not None and data is shipped_data:
+                    continue
+            data = document._native if document.is_composed else document._data
+            self._shipped[index] = (document, data)
+            batches[index % len(workers)].append((index, data))
+
+        removed = [index for index in self._shipped if index >= len(self)]
+        unloads = [[] for _ in workers]
+        for index in removed:
+            del self._shipped[index]
+            unloads[index % len(workers)].append(index)
+
+        commands = [
+            (connection, command, value)
+            for (_, connection), load, unload in zip(workers, batches, unloads)
+            for command, value in (("unload", unload), ("load", load))
+            if value
+        ]
+        for connection, command, value in commands:
+            connection.send((command, value))
+        _receive_from_workers([connection for connection, _, _ in commands])
 
     def query(self, **kwargs):
+        """
+        Query every document, returning a list with a QuerySet for each one.
+        If workers have been started, only the query is sent to them, and they answer with
+        the jsonpaths of the matching nodes, which are picked from the documents of this process.
+        """
 
-        with mp.Pool() as pool:
-            args_to_apply = [partial(jo.query, **kwargs) for jo in self]
-            res = pool.map(_smap, args_to_apply)
-        return res
+        if not self._workers:
+            with mp.Pool() as pool:
+                args_to_apply = [partial(jo.query, **kwargs) for jo in self]
+                res = pool.map(_smap, args_to_apply)
+            return res
+
+        # workers must use the configuration of this process
+        kwargs.setdefault("recursive_", config.RECURSIVE_QUERIES)
+        kwargs.setdefault("include_parent_", config.INCLUDE_PARENTS)
+        kwargs.setdefault("native_types_", config.NATIVE_TYPES)
+
+        self._ship_documents()
+        for _, connection in self._workers:
+            connection.send(("query", kwargs))
+        connections = [connection for _, connection in self._workers]
+        matches = [match for answer in _receive_from_workers(connections) for match in answer]
+
+        output = []
+        for document in self:
+            queryset = QuerySet()
+            queryset._root = document
+            if kwargs["native_types_"]:
+                queryset._native_types = True
+            output.append(queryset)
+        key_lists = {}
+        for index, positions in matches:
+            output[index].append(_node_at_positions(self[index], positions, key_lists))
+        return output
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stop_workers()
+
+
+def _receive_from_workers(connections):
+    """
+    Receive the answer of every worker, in order. Every answer is read before raising
+    the first error, so no answer is left in the pipes for the next command
+    """
+
+    answers = [connection.recv() for connection in connections]
+    for status, value in answers:
+        if status == "error":
+            raise value
+    return [value for _, value in answers]
+
+
+def _child_positions(document, path, key_positions):
+    """
+    Positions of the nodes along path from document: the position of each dict key within
+    its dict, or the list index. key_positions caches the key positions of every dict by its id.
+    Positions don't depend on keys, which become str in the native data sent to workers.
+    """
+
+    node = document
+    positions = []
+    for key in path:
+        if isinstance(node, dict):
+            keys = key_positions.get(id(node))
+            if keys is None:
+                keys = key_positions[id(node)] = {k: i for i, k in enumerate(dict.keys(node))}
+            positions.append(keys[key])
+        else:
+            positions.append(key)
+        node = node[key]
+    return tuple(positions)
+
+
+def _node_at_positions(document, positions, key_lists):
+    """Node of document at the given child positions. key_lists caches the keys of every dict by its id"""
+
+    node = document
+    for position in positions:
+        if isinstance(node, dict):
+            keys = key_lists.get(id(node))
+            if keys is None:
+                keys = key_lists[id(node)] = list(dict.keys(node))
+            node = node[keys[position]]
+        else:
+            node = node[position]
+    return node
+
+
+def _results_worker(connection):
+    """
+    Main loop of a JSONResults worker process. It keeps its shard of documents, and answers
+    queries with (document index, child positions) pairs of the matching nodes
+    """
+
+    documents = {}
+    while True:
+        try:
+            command, value = connection.recv()
+        except EOFError:  # the JSONResults has been deleted
+            break
+        try:
+            if command == "stop":
+                break
+            elif command == "load":
+                for index, data in value:
+                    documents[index] = JSONObject(data)
+                output = None
+            elif command == "unload":
+                for index in value:
+                    documents.pop(index, None)
+                output = None
+            elif command == "query":
+                key_positions = {}
+                output = [
+                    (index, _child_positions(document, node._path_keys, key_positions))
+                    for index, document in documents.items()
+                    if document.is_composed
+                    for node in document.query(**value)
+                ]
+            else:
+                raise ValueError(f"Unknown command: {command}")
+        except Exception as e:
+            connection.send(("error", e))
+        else:
+            connection.send(("ok", output))
+    connection.close()
+
+
+class _AsyncResults:
+    """
+    Result of JSONObject.aopen. Awaiting it returns a JSONObject (single file) or a JSONResults,
+    while iterating it asynchronously yields every JSONObject in completion order.
+    """
+
+    def __init__(self, loader, single=False):
+        self._loader = loader
+        self._single = single
+
+    def __aiter__(self):
+        return self._loader.__aiter__()
+
+    async def _results(self):
+        output = await self._loader
+        return output[0] if self._single else JSONResults(output)
+
+    def __await__(self):
+        return self._results().__await__()
 
 
 def _smap(f):
     return f()
+
+
+# native data of singleton nodes, as given by the json encoder
+_LEAF_DATA = {
+    JSONStr: str.__str__,
+    JSONInt: int.__int__,
+    JSONFloat: float.__float__,
+    JSONBool: lambda node: node._data,
+    JSONNull: lambda node: None,
+    JSONUnknown: JSONUnknown.__str__,
+}
+
+# node builders for native types. Subclasses of these types are handled by the JSONObject switcher
+_NATIVE_BUILDERS = {
+    type(None): lambda data, lazy: JSONNull(data),
+    bool: lambda data, lazy: JSONBool(data),
+    str: lambda data, lazy: JSONStr(data),
+    int: lambda data, lazy: JSONInt(data),
+    float: lambda data, lazy: JSONFloat(data) if data == data else JSONNull(None),
+    dict: lambda data, lazy: _LazyJSONDict(data) if lazy else JSONDict(data),
+    list: lambda data, lazy: _LazyJSONList(data) if lazy else JSONList(data),
+    tuple: lambda data, lazy: _LazyJSONList(data) if lazy else JSONList(data),
+}
@@ -1,24 +1,63 @@
 import functools
-import weakref
 
+import jsonutils.config as config
 
-def memoized_method(*lru_args, **lru_kwargs):
-    # TODO implement in jsonnode
-    def decorator(func):
-        @functools.wraps(func)
-        def wrapped_func(self, *args, **kwargs):
-            # We're storing the wrapped method inside the instance. If we had
-            # a strong reference to self the instance would never die.
-            self_weak = weakref.ref(self)
 
-            @functools.wraps(func)
-            @functools.lru_cache(*lru_args, **lru_kwargs)
-            def cached_method(*args, **kwargs):
-                return func(self_weak(), *args, **kwargs)
+def _parser_settings():
+    """Config values which change the result of parsing a string"""
+    return (config.DECIMAL_SEPARATOR, config.THOUSANDS_SEPARATOR)
 
-            self.__osetattr__(func.__name__, cached_method)
-            return cached_method(*args, **kwargs)
 
-        return wrapped_func
+def _can_rebuild(exception):
+    """Whether a new exception can be built from the type and arguments of exception"""
+    try:
+        exception.__class__(*exception.args)
+    except Exception:
+        return False
+    return True
 
-    return decorator
+
+def memoized_method(func):
+    """
+    Cache the results of a node method in the `_cache` slot of the node, by method name and arguments,
+    so a node value is parsed only once. Results are discarded when parser settings change.
+    Raised exceptions are cached too, by type and arguments (not as objects, whose traceback holds
+    the frames of the call), and a new one is raised each time. Calls with unhashable arguments
+    are not cached.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapped_func(self, *args, **kwargs):
+        try:
+            key = (name, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            return func(self, *args, **kwargs)
+
+        settings = _parser_settings()
+        try:
+            cache = object.__getattribute__(self, "_cache")
+        except AttributeError:
+            cache = None
+        if cache is None or cache[0] != settings:
+            cache = (settings, {})
+            self.__osetattr__("_cache", cache)
+
+        results = cache[1]
+        try:
+            result, exception = results[key]
+        except KeyError:
+            try:
+                result = func(self, *args, **kwargs)
+            except Exception as e:
+                if _can_rebuild(e):
+                    results[key] = (None, (e.__class__, e.args))
+                raise
+            results[key] = (result, None)
+            return result
+        if exception is not None:
+            raise exception[0](*exception[1])
+        return result
+
+    return wrapped_func
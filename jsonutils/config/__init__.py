@@ -1,4 +1,17 @@
+from jsonutils.config.backends import JSON_BACKEND
 from jsonutils.config.completion import AUTOCOMPLETE_ONLY_NODES
+from jsonutils.config.http import (
+    HTTP_BACKOFF_FACTOR,
+    HTTP_BACKOFF_MAX,
+    HTTP_CACHE,
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_SIZE,
+    HTTP_CACHE_TTL,
+    HTTP_POOL_SIZE,
+    HTTP_RATE_BURST,
+    HTTP_RATE_LIMIT,
+    HTTP_RETRY_AFTER_MAX,
+)
 from jsonutils.config.locals import DECIMAL_SEPARATOR, THOUSANDS_SEPARATOR
 from jsonutils.config.queries import (
     CLEVER_PARSING,
@@ -0,0 +1,3 @@
+# json library used to decode and encode json documents. "auto" uses orjson if it is installed,
+# "orjson" requires it, and "json" always uses the standard library.
+JSON_BACKEND = "auto"
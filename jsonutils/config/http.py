@@ -0,0 +1,10 @@
+HTTP_POOL_SIZE = 10  # connections kept alive per host by the shared requests session
+HTTP_BACKOFF_FACTOR = 0.5  # seconds. The n-th retry waits a random time up to factor * 2 ** n
+HTTP_BACKOFF_MAX = 30  # seconds. Upper bound for backoff waits
+HTTP_RETRY_AFTER_MAX = 120  # seconds. Upper bound for waits requested by Retry-After headers
+HTTP_RATE_LIMIT = None  # requests per second allowed for each host. None disables rate limiting
+HTTP_RATE_BURST = 1  # requests that can be sent at once to a host which has been idle
+HTTP_CACHE = False  # if True, successful GET responses are cached (see the settings below)
+HTTP_CACHE_SIZE = 128  # responses kept in memory
+HTTP_CACHE_TTL = 300  # seconds. Older responses are revalidated with ETag/Last-Modified if possible
+HTTP_CACHE_DIR = None  # directory where responses are also stored, to share them between runs
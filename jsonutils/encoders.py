@@ -1,8 +1,17 @@
 """This module provides json serializers for the json objects"""
 
+from functools import lru_cache
 from json import JSONEncoder
 
 
+@lru_cache(maxsize=None)
+def _node_types():
+    # imported lazily, since jsonutils.base depends on this module
+    from jsonutils.base import JSONBool, JSONNode, JSONNull, JSONObject, JSONUnknown
+
+    return JSONBool, JSONNode, JSONNull, JSONObject, JSONUnknown
+
+
 class JSONObjectEncoder(JSONEncoder):
     """
     We need this custom encoder in order to be able to use json.dumps on a JSONObject instance, due to the presence of JSONBool type,
@@ -10,10 +19,12 @@ class JSONObjectEncoder(JSONEncoder):
     """
 
     def default(self, o):
-        from jsonutils.base import JSONBool, JSONNull, JSONUnknown
+        JSONBool, JSONNode, JSONNull, JSONObject, JSONUnknown = _node_types()
 
         if isinstance(o, (JSONBool, JSONNull)):
             return o._data
         if isinstance(o, JSONUnknown):
             return o.__str__()
+        if not isinstance(o, JSONNode):  # raw data from lazy objects, which has not been parsed yet
+            return JSONObject(o)
         return super().default(o)
@@ -45,7 +45,7 @@ from jsonutils.base import (
     JSONUnknown,
 )
 from jsonutils.exceptions import JSONQueryException
-from jsonutils.functions.parsers import parse_datetime, parse_float, url_validator
+from jsonutils.functions.parsers import parse_datetime, parse_float
 from jsonutils.query import All
 
 
@@ -513,7 +513,7 @@ def _type(node, requested_value):
             else:
                 return False
         elif requested_value in ("url", "web"):
-            if url_validator(node, optative_protocol=True):
+            if node.is_url(optative_protocol=True):
                 return True
             else:
                 return False
@@ -556,12 +556,12 @@ def _path(node, requested_value):
     """
     This method analyzes whether a given JSONObject comes from selected path
     """
-    # TODO store jsonpath in cache to avoid call it repeatdly
     # TODO add test
     if isinstance(requested_value, (list, tuple, set)):
-        return all(i in node.jsonpath.keys for i in requested_value)
+        path = node._path_keys
+        return all(i in path for i in requested_value)
     elif isinstance(requested_value, (str, int)):
-        return requested_value in node.jsonpath.keys
+        return requested_value in node._path_keys
     else:
         raise TypeError(
             f"Argument requested_value must be an iterable, str or bool, not {type(requested_value)}"
@@ -572,12 +572,12 @@ def _notpath(node, requested_value):
     """
     This method analyzes whether a given JSONObject does not come from selected path
     """
-    # TODO store jsonpath in cache to avoid call it repeatdly
     # TODO add test
     if isinstance(requested_value, (list, tuple, set)):
-        return not any(i in node.jsonpath.keys for i in requested_value)
+        path = node._path_keys
+        return not any(i in path for i in requested_value)
     elif isinstance(requested_value, (str, int)):
-        return requested_value not in node.jsonpath.keys
+        return requested_value not in node._path_keys
     else:
         raise TypeError(
             f"Argument requested_value must be an iterable, str or bool, not {type(requested_value)}"
@@ -740,4 +740,4 @@ def _nchild(node, requested_value):
         raise TypeError(
             f"Argument 'requested_value' must be a int, not {type(requested_value)}"
         )
-    return len(node.jsonpath.keys) == requested_value
+    return len(node._path_keys) == requested_value
@@ -0,0 +1,166 @@
+"""
+Json decoding and encoding through the backend selected in config.JSON_BACKEND.
+Encoders work on native python data (as returned by the `_data` property of nodes),
+so no per-object callback is needed while encoding. orjson is only used when its output
+is the same as json.dumps, but for floats in exponent notation (like 1e16 instead of 1e+16).
+Indented output (like the one of save) is encoded by orjson and reindented. Output without
+indentation is only encoded by orjson with compact separators: with the default ones (", ", ": ")
+it stays on the json encoder, whose C implementation is faster than fixing orjson separators.
+"""
+import json
+from typing import IO, Any, Union
+
+import jsonutils.config as config
+from jsonutils.functions.external import Orjson
+
+_BACKENDS = ("auto", "orjson", "json")
+
+
+def _backend():
+    """Return the orjson module if it must be used, or None for the standard library"""
+
+    backend = config.JSON_BACKEND
+    if backend not in _BACKENDS:
+        raise ValueError(f"JSON_BACKEND must be one of {_BACKENDS}, not {backend!r}")
+    if backend == "json":
+        return None
+    orjson = Orjson()
+    if orjson is None and backend == "orjson":
+        raise ImportError("orjson backend is selected, but orjson is not installed")
+    return orjson
+
+
+def json_loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """Decode a json document from a string or a bytes-like object"""
+
+    orjson = _backend()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # documents with NaN values or huge integers are decoded by json
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _reindent(text: str, padding: str) -> str:
+    """Replace the 2 spaces indentation of a json text with padding"""
+
+    depth = 0
+    while "\n" + "  " * (depth + 1) in text:
+        depth += 1
+    # deepest lines go first, and their indentation is marked with NUL characters,
+    # which can't be found in json texts, so they are not matched again by upper levels
+    for level in range(depth, 0, -1):
+        text = text.replace("\n" + "  " * level, "\n" + "\0" * level)
+    return text.replace("\0", padding)
+
+
+def _padding(indent: Union[int, str, None]) -> Union[str, None]:
+    """Indentation string of a json.dumps indent"""
+
+    return " " * indent if isinstance(indent, int) else indent
+
+
+def _orjson_option(indent: Union[int, str, None] = None, **kwargs) -> Union[int, None]:
+    """
+    Return the orjson option for the selected json.dumps arguments (but ensure_ascii),
+    or None if orjson is not selected or can't give the same format.
+    Indented output is given with 2 spaces, which must be replaced with the padding of indent.
+    """
+
+    orjson = _backend()
+    separators = kwargs.pop("separators", None)
+    sort_keys = kwargs.pop("sort_keys", False)
+    if orjson is None or kwargs:
+        return None
+    # orjson output is compact, which must be explicitly requested,
+    # or indented with the separators of json.dumps(indent=...)
+    if indent is None:
+        if separators is None or tuple(separators) != (",", ":"):
+            return None
+    elif separators is not None and tuple(separators) != (",", ": "):
+        return None
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent is not None else 0)
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return option
+
+
+def _has_non_finite(data: Any) -> bool:
+    """Whether native python data has a NaN or infinite float"""
+
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if value - value != 0:
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def _orjson_encode(data: Any, option: int, ensure_ascii: bool) -> Union[bytes, None]:
+    """
+    Encode data with orjson and the given option, or return None if the output would differ
+    from json.dumps in more than float formatting
+    """
+
+    orjson = Orjson()
+    try:
+        output = orjson.dumps(data, option=option)
+    except orjson.JSONEncodeError:  # like integers bigger than 64 bits
+        return None
+    if ensure_ascii and not output.isascii():
+        return None
+    # orjson encodes NaN and infinite floats as null, but json as NaN and Infinity
+    if b"null" in output and _has_non_finite(data):
+        return None
+    return output
+
+
+def _orjson_dumps(
+    data: Any, ensure_ascii: bool, indent: Union[int, str, None], **kwargs
+) -> Union[str, None]:
+    """Encode data with orjson, if it is selected and supports the requested format"""
+
+    option = _orjson_option(indent, **kwargs)
+    if option is None:
+        return None
+    output = _orjson_encode(data, option, ensure_ascii)
+    if output is None:
+        return None
+    text = output.decode("utf-8")
+    padding = _padding(indent)
+    return _reindent(text, padding) if padding is not None and padding != "  " else text
+
+
+def json_dumps(
+    data: Any, ensure_ascii: bool = True, indent: Union[int, str, None] = None, **kwargs
+) -> str:
+    """Encode native python data to a json string"""
+
+    output = _orjson_dumps(data, ensure_ascii, indent, **kwargs)
+    if output is not None:
+        return output
+    return json.dumps(data, ensure_ascii=ensure_ascii, indent=indent, **kwargs)
+
+
+def json_dump(
+    data: Any,
+    file: IO[str],
+    ensure_ascii: bool = True,
+    indent: Union[int, str, None] = None,
+    **kwargs,
+) -> None:
+    """Encode native python data to a text file"""
+
+    output = _orjson_dumps(data, ensure_ascii, indent, **kwargs)
+    if output is not None:
+        file.write(output)
+    else:
+        json.dump(data, file, ensure_ascii=ensure_ascii, indent=indent, **kwargs)
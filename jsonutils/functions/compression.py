@@ -0,0 +1,113 @@
+"""
+Compressed file support for readers and writers. Files are decompressed (or compressed)
+as streams, so the uncompressed data is never held twice in memory.
+"""
+import bz2
+import gzip
+import io
+import lzma
+from pathlib import Path
+from typing import IO, Optional
+
+from jsonutils.functions.external import Zstandard
+
+# compression -> (file extension, magic bytes)
+_COMPRESSIONS = {
+    "gzip": (".gz", b"\x1f\x8b"),
+    "bz2": (".bz2", b"BZh"),
+    "xz": (".xz", b"\xfd7zXZ\x00"),
+    "zstd": (".zst", b"\x28\xb5\x2f\xfd"),
+}
+
+
+def _zstandard():
+    zstandard = Zstandard()
+    if zstandard is None:
+        raise ImportError("zstandard package is required for zstd compressed files")
+    return zstandard
+
+
+def _compression_from_path(path) -> Optional[str]:
+    """Compression given by the extension of path, or None"""
+
+    suffix = Path(path).suffix.lower()
+    for compression, (extension, _) in _COMPRESSIONS.items():
+        if suffix == extension:
+            return compression
+    return None
+
+
+def _compression_from_bytes(data: bytes) -> Optional[str]:
+    """Compression given by the magic bytes at the start of data, or None"""
+
+    for compression, (_, magic) in _COMPRESSIONS.items():
+        if data.startswith(magic):
+            return compression
+    return None
+
+
+def _check_compression(compression: Optional[str]) -> None:
+    if compression is not None and compression not in _COMPRESSIONS:
+        raise ValueError(
+            f"compression must be one of {tuple(_COMPRESSIONS)} or None, not {compression!r}"
+        )
+
+
+def _open_binary(
+    path, mode: str = "rb", compression: Optional[str] = "infer"
+) -> IO[bytes]:
+    """
+    Open a file in binary mode ("rb", "wb" or "ab"), decompressing or compressing it as a stream.
+    If compression is "infer", it is taken from the file extension, or, when reading,
+    from the magic bytes of the file.
+    """
+
+    if compression == "infer":
+        compression = _compression_from_path(path)
+        if compression is None and mode == "rb":
+            with open(path, "rb") as file:
+                compression = _compression_from_bytes(file.read(8))
+    _check_compression(compression)
+
+    if compression is None:
+        return open(path, mode)
+    elif compression == "gzip":
+        return gzip.open(path, mode)
+    elif compression == "bz2":
+        return bz2.open(path, mode)
+    elif compression == "xz":
+        return lzma.open(path, mode)
+
+    zstandard = _zstandard()
+    file = open(path, mode)
+    try:
+        if mode == "rb":
+            decompressor = zstandard.ZstdDecompressor()
+            return io.BufferedReader(decompressor.stream_reader(file, read_across_frames=True))
+        return zstandard.ZstdCompressor().stream_writer(file)
+    except BaseException:
+        file.close()
+        raise
+
+
+def _open_text(path, mode: str = "r", compression: Optional[str] = "infer") -> IO[str]:
+    """Like _open_binary, but for utf-8 text ("r", "w" or "a" modes)"""
+
+    return io.TextIOWrapper(_open_binary(path, mode + "b", compression), encoding="utf-8")
+
+
+def _decompress(data: bytes) -> bytes:
+    """Decompress data (like a downloaded file) if it starts with known magic bytes"""
+
+    compression = _compression_from_bytes(data)
+    if compression is None:
+        return data
+    elif compression == "gzip":
+        return gzip.decompress(data)
+    elif compression == "bz2":
+        return bz2.decompress(data)
+    elif compression == "xz":
+        return lzma.decompress(data)
+    decompressor = _zstandard().ZstdDecompressor()
+    with decompressor.stream_reader(data, read_across_frames=True) as reader:
+        return reader.read()
@@ -2,6 +2,7 @@
 We put here all references to third packages functions or methods
 """
 import sys
+from functools import lru_cache
 from typing import Any
 
 from jsonutils.functions.decorators import return_value_on_exception
@@ -10,14 +11,28 @@ from jsonutils.functions.decorators import return_value_on_exception
 @return_value_on_exception(False)
 def isPandasNAN(instance: Any, fail_silently: bool = True) -> bool:
 
-    import pandas as pd
+    isna = PandasIsNA()
+    if isna is None:
+        return False
 
-    result = pd.isna(instance)
+    result = isna(instance)
     if not isinstance(result, bool):
         return False
     return result
 
 
+@lru_cache(maxsize=None)
+def PandasIsNA():
+
+    try:
+        from pandas import isna
+
+        return isna
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=None)
 def DjangoQuerySet():
 
     try:
@@ -28,6 +43,7 @@ def DjangoQuerySet():
         return type(None)
 
 
+@lru_cache(maxsize=None)
 def PandasDataFrame():
 
     try:
@@ -38,6 +54,7 @@ def PandasDataFrame():
         return type(None)
 
 
+@lru_cache(maxsize=None)
 def PandasSeries():
 
     try:
@@ -48,6 +65,7 @@ def PandasSeries():
         return type(None)
 
 
+@lru_cache(maxsize=None)
 def NumpyInt64():
 
     try:
@@ -58,6 +76,7 @@ def NumpyInt64():
         return type(None)
 
 
+@lru_cache(maxsize=None)
 def NumpyFloat64():
 
     try:
@@ -68,6 +87,7 @@ def NumpyFloat64():
         return type(None)
 
 
+@lru_cache(maxsize=None)
 def NumpyFloat32():
 
     try:
@@ -78,6 +98,7 @@ def NumpyFloat32():
         return type(None)
 
 
+@lru_cache(maxsize=None)
 def NumpyFloat16():
 
     try:
@@ -88,6 +109,7 @@ def NumpyFloat16():
         return type(None)
 
 
+@lru_cache(maxsize=None)
 def NumpyInt8():
 
     try:
@@ -98,6 +120,7 @@ def NumpyInt8():
         return type(None)
 
 
+@lru_cache(maxsize=None)
 def NumpyArray():
 
     try:
@@ -106,3 +129,36 @@ def NumpyArray():
         return ndarray
     except ImportError:
         return type(None)
+
+
+@lru_cache(maxsize=None)
+def Numpy():
+
+    try:
+        import numpy
+
+        return numpy
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def Orjson():
+
+    try:
+        import orjson
+
+        return orjson
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def Zstandard():
+
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        return None
@@ -2,17 +2,18 @@
 # TODO parse image links as text
 import ast
 import re
-from datetime import date, datetime
-from functools import reduce
+from datetime import MINYEAR, date, datetime
+from functools import lru_cache, reduce
 from json import JSONDecoder
 
 import jsonutils.base as base
 import pytz
-import requests
 import jsonutils.config as config
 from jsonutils.exceptions import JSONQueryException, JSONSingletonException
 from jsonutils.functions.decorators import catch_exceptions, return_str_or_datetime
+from jsonutils.functions.external import Numpy
 from jsonutils.query import All, AllChoices, ExtractYear, I, QuerySet
+from jsonutils.utils import http
 from jsonutils.utils.retry import retry_function
 from jsonutils.utils.urls import join_paths
 
@@ -28,291 +29,313 @@ _DEFAULT_UNITS_FACTOR_DICT = {
 }
 
 
-def _parse_query(node, include_parent_, **q):
+_VALID_QUERY_VALUE_TYPES = (
+    type,
+    float,
+    int,
+    str,
+    type(None),
+    bool,
+    dict,
+    list,
+    tuple,
+    date,
+    datetime,
+    AllChoices,
+)
+
+# ---- COMPILED QUERY STEPS ----
+# each query lookup (like <key>__parent__c_A__gt) is translated into a tuple of (step, argument) pairs
+_STEP_ACTION = 0  # call a node action
+_STEP_PARENT = 1  # parent modificator
+_STEP_PARENTS = 2  # multiparents modificator, its argument is the tuple of remaining steps
+_STEP_CHILD = 3  # child modificator (c_<key>)
+_STEP_INDEX = 4  # list index modificator
+_STEP_YEAR = 5  # year modificator
+_STEP_YEAR_ACTION = 6  # an action called over an ExtractYear object
+
+_CHILD_MODIFICATOR = re.compile(r"c_(\w+)")
+
+
+def _check_query_value(query_value):
+    if not isinstance(query_value, _VALID_QUERY_VALUE_TYPES):
+        raise JSONQueryException(
+            f"Target value of query has invalid type: {type(query_value)}. Valid types are: float, int, str, None, bool, dict, list, tuple, date, datetime, allchoices"
+        )
+
+
+@lru_cache(maxsize=None)
+def _node_actions():
+    """Returns a dict of node actions (without the action suffix) and the JSONNode methods implementing them"""
+
+    return {
+        i.replace("_action", ""): getattr(base.JSONNode, i)
+        for i in dir(base.JSONNode)
+        if i.endswith("action")
+    }
+
+
+@lru_cache(maxsize=1024)
+def _compile_actions(target_actions):
     """
-    We must determine whether the child passed as input argument matches the conditions given by the query q.
-    If required actions don't match the child type, it won't throw any exception, just returns False for such an object, and
-    it won't be appended to the queryset.
-    Query q must be structured as follows:
-        <key>__<modificator>__<query>
+    Translate a tuple of query actions and modificators, like ("parent", "c_A", "gt"), into a tuple of steps.
+    This way, actions are validated and resolved only once, instead of once per node.
     """
 
-    # grab a list of node actions, without the action suffix
-    node_actions = [
-        i.replace("_action", "") for i in dir(base.JSONNode) if i.endswith("action")
-    ]
+    node_actions = _node_actions()
+    exact_step = (_STEP_ACTION, node_actions["exact"])
+
+    steps = []
+    modificator_check = True
+    actions_count = len(target_actions)
+    for idx, action in enumerate(target_actions):
+        is_last = idx == actions_count - 1
+        if modificator_check:
+            # ---- MODIFICATORS ----
+            if action == "parent":
+                steps.append((_STEP_PARENT, None))
+                if is_last:
+                    steps.append(exact_step)  # if parent is last action, take exact as the default one
+                continue
+            elif action == "parents":  # multiparents modificator
+                remaining_actions = target_actions[idx + 1 :]
+                if "parents" in remaining_actions:
+                    raise JSONQueryException("Lookup parents can only be included once")
+                steps.append((_STEP_PARENTS, _compile_actions(remaining_actions)))
+                return tuple(steps)  # remaining actions are evaluated over each parent
+            elif match := _CHILD_MODIFICATOR.fullmatch(action):  # child modificator
+                steps.append((_STEP_CHILD, match.group(1)))
+                if is_last:
+                    steps.append(exact_step)  # if child is last action, take exact as the default one
+                continue
+            elif action.isdigit():
+                steps.append((_STEP_INDEX, int(action)))
+                if is_last:
+                    steps.append(exact_step)  # if digit is last action, take exact as the default one
+                continue
+            elif action == "year":  # TODO add test for year
+                if len(target_actions[idx + 1 :]) > 1:
+                    raise JSONQueryException(f"After year lookup, cannot set more actions")
+                steps.append((_STEP_YEAR, None))
+                if is_last:
+                    steps.append((_STEP_YEAR_ACTION, "exact_action"))
+                modificator_check = False  # continue to next action without cheking more modificators
+                continue
+        # ---- ACTIONS ----
+        # node actions can't interfer with modificators
+        if action not in node_actions:
+            raise JSONQueryException(f"Bad query: {action}")
+        if modificator_check:
+            steps.append((_STEP_ACTION, node_actions[action]))
+        else:
+            steps.append((_STEP_YEAR_ACTION, action + "_action"))
+    return tuple(steps)
 
-    class UniqueList(list):
-        """A list but appending only unique values"""
-
-        def append(self, object):
-            return super().append(object) if object not in self else None
-
-    def make_actions(obj, target_actions, query_value):
-        MODIFICATOR_CHECK = True
-        actions_count = len(target_actions)
-        for idx, action in enumerate(target_actions):
-            if MODIFICATOR_CHECK:
-                # ---- MODIFICATORS ----
-                # modify obj before apply actions
-                if action == "parent":
-                    obj = obj.parent
-                    if obj is None:
-                        return False
-                    if idx == actions_count - 1:
-                        action = "exact"  # if parent is last action, take exact as the default one
-                    else:
-                        continue  # continue to next action or modificator
-                elif action == "parents":  # multiparents modificator
-                    parents = obj.parent_list
-                    if not parents:
-                        return False
-                    if "parents" in target_actions[idx + 1 :]:
-                        raise JSONQueryException(
-                            "Lookup parents can only be included once"
-                        )
-
-                    results = (
-                        make_actions(i, target_actions[idx + 1 :], query_value)
-                        for i in parents
-                    )
-                    if any(results):
-                        return True  # no more actions, continue with next query
-                    else:
-                        return False
-                elif match := re.fullmatch(r"c_(\w+)", action):  # child modificator
-                    try:
-                        obj = obj.__getitem__(match.group(1))
-                    except Exception:
-                        return False
-                    if idx == actions_count - 1:
-                        action = "exact"  # if child is last action, take exact as the default one
-                    else:
-                        continue  # continue to next action or modificator
-                elif action.isdigit():
-                    if not isinstance(obj, list):
-                        return False
-                    try:
-                        obj = obj[int(action)]
-                    except IndexError:
-                        return False
-                    if idx == actions_count - 1:
-                        action = "exact"  # if digit is last action, take exact as the default one
-                    else:
-                        continue  # continue to next action or modificator
-                elif action == "year":  # TODO add test for year
-                    if len(target_actions[idx + 1 :]) > 1:
-                        raise JSONQueryException(
-                            f"After year lookup, cannot set more actions"
-                        )
-                    obj = ExtractYear(obj)
-                    if idx == actions_count - 1:
-                        action = "exact"  # if year is last action, take exact as the default one
-                    else:
-                        MODIFICATOR_CHECK = False
-                        continue  # continue to next action without cheking more modificators
-            # ---- MATCH ----
-            # all comparisons have child object to the left, and the underlying algorithm is contained in the magic methods of the JSON objects
-            # no errors will be thrown, if types are not compatible, just returns False
-            # node actions can't interfer with modificators
-            if action in node_actions:  # call corresponding node method
-                result = getattr(obj, action + "_action")(query_value)
-                if not result:
-                    return False
-            else:
-                raise JSONQueryException(f"Bad query: {action}")
-        return True
 
-    target_keys = UniqueList()
-
-    for query_key, query_value in q.items():
-        if not isinstance(
-            query_value,
-            (
-                type,
-                float,
-                int,
-                str,
-                type(None),
-                bool,
-                dict,
-                list,
-                tuple,
-                date,
-                datetime,
-                AllChoices,
-            ),
-        ):
-            raise JSONQueryException(
-                f"Target value of query has invalid type: {type(query_value)}. Valid types are: float, int, str, None, bool, dict, list, tuple, date, datetime, allchoices"
-            )
-        splitted_query = [i for i in query_key.split("__") if i]
+def _run_steps(obj, steps, query_value):
+    """
+    Evaluate a tuple of compiled steps over a node.
+    All comparisons have the node object to the left, and the underlying algorithm is contained in the magic methods of the JSON objects.
+    No errors will be thrown, if types are not compatible, just returns False.
+    """
+
+    for step, argument in steps:
+        if step == _STEP_ACTION:
+            if not argument(obj, query_value):
+                return False
+        elif step == _STEP_PARENT:
+            obj = obj.parent
+            if obj is None:
+                return False
+        elif step == _STEP_CHILD:
+            try:
+                obj = obj.__getitem__(argument)
+            except Exception:
+                return False
+        elif step == _STEP_INDEX:
+            if not isinstance(obj, list):
+                return False
+            try:
+                obj = obj[argument]
+            except IndexError:
+                return False
+        elif step == _STEP_PARENTS:
+            parents = obj.parent_list
+            if not parents:
+                return False
+            return any(_run_steps(i, argument, query_value) for i in parents)
+        elif step == _STEP_YEAR:
+            obj = ExtractYear(obj)
+        elif step == _STEP_YEAR_ACTION:
+            if not getattr(obj, argument)(query_value):
+                return False
+    return True
+
+
+def _split_query_key(query_key):
 
-        if not splitted_query:
-            raise JSONQueryException("Bad query. Missing target key")
+    splitted_query = tuple(i for i in query_key.split("__") if i)
+
+    if not splitted_query:
+        raise JSONQueryException("Bad query. Missing target key")
+
+    return splitted_query[0], splitted_query[1:] or ("exact",)
+
+
+@lru_cache(maxsize=256)
+def _compile_lookups(query_keys):
+    """
+    Compile the keys of a query (a tuple like ("A__gt", "B__parent__c_C")) into its target key and a tuple of steps for each key.
+    Query values are not taken into account, so the result can be cached regardless of them.
+    """
 
-        target_key = splitted_query[0]
-        target_actions = splitted_query[1:] or ["exact"]
+    target_keys = []
+    lookups = []
+    for query_key in query_keys:
+        target_key, target_actions = _split_query_key(query_key)
 
-        target_keys.append(target_key)
+        if target_key not in target_keys:
+            target_keys.append(target_key)
 
         if len(target_keys) > 1:  # MULTIQUERY MODE
             # in a multiquery mode, we take the outer dict which contains the first target key
             # so we prepend __parent__c_<target_key> in the target_actions list
-            target_actions = ["parent", f"c_{target_key}"] + target_actions
-            target_key = target_keys[0]
+            target_actions = ("parent", f"c_{target_key}") + target_actions
 
-        # first of all, if target key of query argument does not match child's key, we won't append it to querylist
-        if target_key != node._key:
-            return False, None
+        lookups.append(_compile_actions(target_actions))
 
-        obj = node
+    return (target_keys[0] if target_keys else None), tuple(lookups)
 
-        result = make_actions(obj, target_actions, query_value)
-        if result is False:
-            return False, None
-    return (True, node.parent if include_parent_ else node)
 
+@lru_cache(maxsize=256)
+def _compile_key_lookups(query_keys):
+    """Like _compile_lookups, but for query_key requests, in which query keys are only made of actions"""
 
-def _parse_query_key(node, pattern, include_parent_, **q):
-    """ """
-    # --- first checks ----
-    if not node._key:
-        return False, None
+    lookups = []
+    for query_key in query_keys:
+        target_actions = tuple(i for i in query_key.split("__") if i)
 
-    if pattern == "*":
-        pattern = ".*"
-    if isinstance(pattern, str):
-        pattern = re.compile(pattern)
-    elif isinstance(pattern, I):
-        pattern = pattern.data
-    elif isinstance(pattern, re.Pattern):
-        pass
-    else:
-        raise TypeError(f"Argument pattern must be an string or regex pattern")
+        if not target_actions:
+            raise JSONQueryException("Bad query. Missing actions")
 
-    if not q:
-        q = {"exact": All}
+        lookups.append(_compile_actions(target_actions))
+    return tuple(lookups)
 
-    # --------------------
 
-    # grab a list of node actions, without the action suffix
-    node_actions = [
-        i.replace("_action", "") for i in dir(base.JSONNode) if i.endswith("action")
-    ]
+class QueryPlan:
+    """
+    A compiled query.
+    It is built once per query request, so that the query arguments don't have to be parsed on each node.
+    Query q must be structured as follows:
+        <key>__<modificator>__<query>
 
-    def make_actions(obj, target_actions, query_value):
-        MODIFICATOR_CHECK = True
-        actions_count = len(target_actions)
-        for idx, action in enumerate(target_actions):
-            if MODIFICATOR_CHECK:
-                # ---- MODIFICATORS ----
-                # modify obj before apply actions
-                if action == "parent":
-                    obj = obj.parent
-                    if obj is None:
-                        return False
-                    if idx == actions_count - 1:
-                        action = "exact"  # if parent is last action, take exact as the default one
-                    else:
-                        continue  # continue to next action or modificator
-                elif action == "parents":  # multiparents modificator
-                    parents = obj.parent_list
-                    if not parents:
-                        return False
-                    if "parents" in target_actions[idx + 1 :]:
-                        raise JSONQueryException(
-                            "Lookup parents can only be included once"
-                        )
-
-                    results = (
-                        make_actions(i, target_actions[idx + 1 :], query_value)
-                        for i in parents
-                    )
-                    if any(results):
-                        return True  # no more actions, continue with next query
-                    else:
-                        return False
-                elif match := re.fullmatch(r"c_(\w+)", action):  # child modificator
-                    try:
-                        obj = obj.__getitem__(match.group(1))
-                    except Exception:
-                        return False
-                    if idx == actions_count - 1:
-                        action = "exact"  # if child is last action, take exact as the default one
-                    else:
-                        continue  # continue to next action or modificator
-                elif action.isdigit():
-                    if not isinstance(obj, list):
-                        return False
-                    try:
-                        obj = obj[int(action)]
-                    except IndexError:
-                        return False
-                    if idx == actions_count - 1:
-                        action = "exact"  # if digit is last action, take exact as the default one
-                    else:
-                        continue  # continue to next action or modificator
-                elif action == "year":  # TODO add test for year
-                    if len(target_actions[idx + 1 :]) > 1:
-                        raise JSONQueryException(
-                            f"After year lookup, cannot set more actions"
-                        )
-                    obj = ExtractYear(obj)
-                    if idx == actions_count - 1:
-                        action = "exact"  # if year is last action, take exact as the default one
-                    else:
-                        MODIFICATOR_CHECK = False
-                        continue  # continue to next action without cheking more modificators
-            # ---- MATCH ----
-            # all comparisons have child object to the left, and the underlying algorithm is contained in the magic methods of the JSON objects
-            # no errors will be thrown, if types are not compatible, just returns False
-            # node actions can't interfer with modificators
-            if action in node_actions:  # call corresponding node method
-                result = getattr(obj, action + "_action")(query_value)
-                if not result:
-                    return False
-            else:
-                raise JSONQueryException(f"Bad query: {action}")
+    Attributes
+    ----------
+        target_key: the key that a node must have in order to match the query.
+        lookups: a tuple of (steps, query_value) pairs, which must be all satisfied by the node.
+    """
+
+    def __init__(self, q):
+
+        for query_value in q.values():
+            _check_query_value(query_value)
+
+        self.target_key, steps = _compile_lookups(tuple(q))
+        self.lookups = tuple(zip(steps, q.values()))
+
+    def match(self, node):
+        """
+        We must determine whether the node passed as input argument matches the conditions given by the query.
+        If required actions don't match the node type, it won't throw any exception, just returns False.
+        """
+
+        if not self.lookups:
+            return True
+
+        # first of all, if target key of query argument does not match node's key, we won't append it to querylist
+        if node._key != self.target_key:
+            return False
+
+        for steps, query_value in self.lookups:
+            if not _run_steps(node, steps, query_value):
+                return False
         return True
 
-    for query_key, query_value in q.items():
-        if not isinstance(
-            query_value,
-            (
-                type,
-                float,
-                int,
-                str,
-                type(None),
-                bool,
-                dict,
-                list,
-                tuple,
-                date,
-                datetime,
-                AllChoices,
-            ),
-        ):
-            raise JSONQueryException(
-                f"Target value of query has invalid type: {type(query_value)}. Valid types are: float, int, str, None, bool, dict, list, tuple, date, datetime, allchoices"
-            )
-        target_actions = [i for i in query_key.split("__") if i]
 
-        if not target_actions:
-            raise JSONQueryException("Bad query. Missing actions")
+class KeyQueryPlan(QueryPlan):
+    """
+    A compiled query_key request.
+    Nodes match if their key fullmatch the pattern and all the lookups are satisfied.
+    """
+
+    def __init__(self, pattern, q):
+
+        if pattern == "*":
+            pattern = ".*"
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        elif isinstance(pattern, I):
+            pattern = pattern.data
+        elif isinstance(pattern, re.Pattern):
+            pass
+        else:
+            raise TypeError(f"Argument pattern must be an string or regex pattern")
+
+        if not q:
+            q = {"exact": All}
+
+        for query_value in q.values():
+            _check_query_value(query_value)
+
+        self.target_key = None
+        self.pattern = pattern
+        self.lookups = tuple(zip(_compile_key_lookups(tuple(q)), q.values()))
 
-        # first of all, if target key of query argument does not match child's key, we won't append it to querylist
-        if not pattern.fullmatch(node._key):
-            return False, None
+    def match(self, node):
 
-        obj = node
+        if not node._key:
+            return False
+
+        if not self.pattern.fullmatch(node._key):
+            return False
 
-        result = make_actions(obj, target_actions, query_value)
-        if result is False:
-            return False, None
+        for steps, query_value in self.lookups:
+            if not _run_steps(node, steps, query_value):
+                return False
+        return True
 
-    return (True, node.parent if include_parent_ else node)
+
+# ---- NUMBER PARSING ----
+# characters which can start a number, after any whitespace, besides digits and thousands separators
+# (dots, and the first letters of nan and inf, are accepted by float)
+_NUMBER_PREFIXES = "$€+-.nNiI"
+
+
+@lru_cache(maxsize=None)
+def _number_patterns(decimal_sep, thousands_sep):
+    """Compiled patterns of float and int numbers (with units) for a pair of separators"""
+
+    float_pattern = re.compile(
+        fr"\s*(?:[\$€]*\s*([+-])?\s*|([+-])?\s*[\$€]*\s*)([0-9{thousands_sep}]+)({decimal_sep}[0-9]+)?\s*[\$€]*(\w{{,8}})\.?\s*"
+    )
+    int_pattern = re.compile(
+        fr"\s*(?:[\$€]*\s*([+-])?\s*|([+-])?\s*[\$€]*\s*)(\d+(?:\d|{thousands_sep}\d+)*)\s*[\$€]*(\w{{,8}})\.?\s*"
+    )
+    return float_pattern, int_pattern
+
+
+def _may_be_number(s, thousands_sep):
+    """
+    Cheap check which rejects most strings that neither float nor number patterns can parse:
+    their first character, after any whitespace, must be a digit, a sign, a currency, a dot,
+    the first letter of nan or inf, or a thousands separator
+    """
+
+    stripped = s.lstrip()
+    if not stripped:
+        return False
+    first = stripped[0]
+    return first.isdigit() or first in _NUMBER_PREFIXES or first in thousands_sep
 
 
 @catch_exceptions
@@ -338,6 +361,10 @@ def parse_float(
         raise JSONSingletonException("s argument cannot be boolean type")
     if units_factor_dict is None:
         units_factor_dict = _DEFAULT_UNITS_FACTOR_DICT
+    if isinstance(s, str) and not _may_be_number(s, thousands_sep):
+        if only_check:
+            return False
+        raise JSONSingletonException(f"Target string does not match a float number: {s}")
     try:
         result = float(s)
     except Exception:
@@ -347,10 +374,7 @@ def parse_float(
             return True
         else:
             return result
-    match = re.fullmatch(
-        fr"\s*(?:[\$€]*\s*([+-])?\s*|([+-])?\s*[\$€]*\s*)([0-9{thousands_sep}]+)({decimal_sep}[0-9]+)?\s*[\$€]*(\w{{,8}})\.?\s*",
-        s,
-    )
+    match = _number_patterns(decimal_sep, thousands_sep)[0].fullmatch(s)
     if not match:
         if only_check:
             return False
@@ -396,6 +420,10 @@ def parse_int(
         raise JSONSingletonException("s argument cannot be boolean type")
     if units_factor_dict is None:
         units_factor_dict = _DEFAULT_UNITS_FACTOR_DICT
+    if isinstance(s, str) and not _may_be_number(s, thousands_sep):
+        if only_check:
+            return False
+        raise JSONSingletonException(f"Target string does not match a int number: {s}")
     try:
         result = int(s)
     except Exception:
@@ -407,10 +435,7 @@ def parse_int(
             return True
         else:
             return result
-    match = re.fullmatch(
-        fr"\s*(?:[\$€]*\s*([+-])?\s*|([+-])?\s*[\$€]*\s*)(\d+(?:\d|{thousands_sep}\d+)*)\s*[\$€]*(\w{{,8}})\.?\s*",
-        s,
-    )
+    match = _number_patterns(decimal_sep, thousands_sep)[1].fullmatch(s)
     if not match:
         if only_check:
             return False
@@ -428,6 +453,113 @@ def parse_int(
     return result
 
 
+# ---- DATETIME PARSING ----
+_DATETIME_CACHE_SIZE = 4096
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1
+    )
+}
+# ISO 8601 strings which datetime.fromisoformat parses as the first of _DATETIME_PATTERNS does
+_ISO_DATETIME = re.compile(
+    r"(\d{4}-\d{2}-\d{2})(?:[T ](\d{2}:\d{2}:\d{2})(?:\.\d{3,})?([Zz]|[+-]\d{2}:\d{2})?)?"
+)
+_DATETIME_PATTERNS = tuple(
+    re.compile(pattern, re.I)
+    for pattern in (
+        r"\s*(?P<year>\d{4})[/\-.](?P<month>\d{1,2})[/\-.](?P<day>\d{1,2})\s*(?:T?\s*(?P<hour>\d{2})[:.](?P<min>\d{2})[:.](?P<sec>\d{2})(?:[Zz]|\.\d{3,}[Zz]?|(?:\.\d{3,})?(?P<off_sign>[+-])(?P<off_hh>\d{2}):(?P<off_mm>\d{2}))?\s*)?",
+        r"\s*(?P<day>\d{1,2})[/\-.](?P<month>\d{1,2})[/\-.](?P<year>\d{4})\s*(?:T?\s*(?P<hour>\d{2})[:.](?P<min>\d{2})[:.](?P<sec>\d{2})(?:[Zz]|\.\d{3,}[Zz]?|(?:\.\d{3,})?(?P<off_sign>[+-])(?P<off_hh>\d{2}):(?P<off_mm>\d{2}))?\s*)?",
+        r"\s*(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?\s*,?\s*(?P<day>\d{1,2})\s*,?\s*(?P<year>\d{4})\s*,?\s*(?:T?\s*(?P<hour>\d{1,2})[:.](?P<min>\d{2})(?:[:](?P<sec>\d{2}))?(?:[Zz]|\.\d{3,}[Zz]?|(?:\.\d{3,})?(?P<off_sign>[+-])(?P<off_hh>\d{2}):(?P<off_mm>\d{2}))?\s*)?",
+        r"\s*(?P<day>\d{1,2})\s*,?\s*(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\s*\.?\s*,?\s*(?P<year>\d{4})\s*,?\s*(?:T?\s*(?P<hour>\d{1,2})[:.](?P<min>\d{2})(?:[:](?P<sec>\d{2}))?(?:[Zz]|\.\d{3,}[Zz]?|(?:\.\d{3,})?(?P<off_sign>[+-])(?P<off_hh>\d{2}):(?P<off_mm>\d{2}))?\s*)?",
+    )
+)
+
+
+@lru_cache(maxsize=None)
+def _timezone(name):
+    return pytz.timezone(name)
+
+
+@lru_cache(maxsize=None)
+def _offset_timezone(offset):
+    """Fixed offset timezone of a +HH:MM string"""
+    return datetime.strptime(offset, "%z").tzinfo
+
+
+def _set_timezone(value, offset, tzone_aware, tzone):
+    """Set the timezone of a naive datetime: the parsed offset if any, else tzone"""
+
+    if not tzone_aware:
+        return value
+    if offset is not None:
+        return value.replace(tzinfo=offset)
+    return tzone.localize(value)
+
+
+def _parse_iso_datetime(s, tzone_aware, only_date, tzone):
+    """Fast path of _parse_datetime_string for ISO 8601 strings. Returns None if s can't be parsed this way"""
+
+    match = _ISO_DATETIME.fullmatch(s)
+    if not match:
+        return None
+    day, time, zone = match.groups()
+    try:
+        value = datetime.fromisoformat(day if only_date or time is None else f"{day}T{time}")
+        offset = _offset_timezone(zone) if zone and zone not in "Zz" else None
+    except ValueError:  # like a wrong month, whose error is given by the regular path
+        return None
+    return _set_timezone(value, offset, tzone_aware, _timezone(tzone) if offset is None else None)
+
+
+@lru_cache(maxsize=_DATETIME_CACHE_SIZE)
+def _parse_datetime_string(s, only_check, tzone_aware, only_date, tzone):
+    """
+    Parse a datetime string for parse_datetime, trying datetime.fromisoformat first,
+    and then the precompiled patterns. Returns a (result, error message) pair,
+    so that failures are cached too.
+    """
+
+    if _ISO_DATETIME.fullmatch(s):
+        if only_check:
+            return True, None
+        value = _parse_iso_datetime(s, tzone_aware, only_date, tzone)
+        if value is not None:
+            return value, None
+
+    for pattern in _DATETIME_PATTERNS:
+        match = pattern.fullmatch(s)
+        if not match:
+            continue
+        if only_check:
+            return True, None
+
+        groups = match.groupdict()
+        year, day = int(groups["year"]), int(groups["day"])
+        month = groups["month"]
+        month = int(month) if month.isdigit() else _MONTHS[month[:3].lower()]
+        hour, minute, second = (int(groups[i] or 0) for i in ("hour", "min", "sec"))
+        if groups["off_sign"]:
+            offset = _offset_timezone(f"{groups['off_sign']}{groups['off_hh']}:{groups['off_mm']}")
+            zone = None
+        else:
+            offset = None
+            zone = _timezone(tzone)
+
+        try:
+            if only_date:
+                value = datetime(year, month, day)
+            else:
+                value = datetime(year, month, day, hour, minute, second)
+            return _set_timezone(value, offset, tzone_aware, zone), None
+        except Exception as e:
+            return None, f"Error on introduced datetime. {e}"
+
+    if only_check:
+        return False, None
+    return None, f"Can't parse target datetime: {s}"
+
+
 @catch_exceptions
 @return_str_or_datetime
 def parse_datetime(
@@ -456,7 +588,7 @@ def parse_datetime(
     if is_timestamp and parse_int(s, only_check=True):
         parsed_datetime = datetime.fromtimestamp(parse_int(s))
         if tzone_aware:
-            zone = pytz.timezone(tzone)
+            zone = _timezone(tzone)
             parsed_datetime = zone.localize(parsed_datetime)
         if only_date:
             parsed_datetime = parsed_datetime.replace(
@@ -485,7 +617,7 @@ def parse_datetime(
                     )
                 )
             else:  # if not tzinfo is shown, put tzone as default
-                zone = pytz.timezone(tzone)
+                zone = _timezone(tzone)
                 if not only_date:
                     return zone.localize(unified_datetime)
                 else:
@@ -502,108 +634,14 @@ def parse_datetime(
                 )
             )
 
-    def fill(x):
-        if x is None:
-            return 0
-        else:
-            try:
-                return int(x)
-            except ValueError:
-                if isinstance(x, str):
-                    lower_month = x.lower()
-                    if "jan" in lower_month:
-                        return 1
-                    elif "feb" in lower_month:
-                        return 2
-                    elif "mar" in lower_month:
-                        return 3
-                    elif "apr" in lower_month:
-                        return 4
-                    elif "may" in lower_month:
-                        return 5
-                    elif "jun" in lower_month:
-                        return 6
-                    elif "jul" in lower_month:
-                        return 7
-                    elif "aug" in lower_month:
-                        return 8
-                    elif "sep" in lower_month:
-                        return 9
-                    elif "oct" in lower_month:
-                        return 10
-                    elif "nov" in lower_month:
-                        return 11
-                    elif "dec" in lower_month:
-                        return 12
-                    else:
-                        return
-                else:
-                    return
-
-    patterns = (
-        r"\s*(?P<year>\d{4})[/\-.](?P<month>\d{1,2})[/\-.](?P<day>\d{1,2})\s*(?:T?\s*(?P<hour>\d{2})[:.](?P<min>\d{2})[:.](?P<sec>\d{2})(?:[Zz]|\.\d{3,}[Zz]?|(?:\.\d{3,})?(?P<off_sign>[+-])(?P<off_hh>\d{2}):(?P<off_mm>\d{2}))?\s*)?",
-        r"\s*(?P<day>\d{1,2})[/\-.](?P<month>\d{1,2})[/\-.](?P<year>\d{4})\s*(?:T?\s*(?P<hour>\d{2})[:.](?P<min>\d{2})[:.](?P<sec>\d{2})(?:[Zz]|\.\d{3,}[Zz]?|(?:\.\d{3,})?(?P<off_sign>[+-])(?P<off_hh>\d{2}):(?P<off_mm>\d{2}))?\s*)?",
-        r"\s*(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?\s*,?\s*(?P<day>\d{1,2})\s*,?\s*(?P<year>\d{4})\s*,?\s*(?:T?\s*(?P<hour>\d{1,2})[:.](?P<min>\d{2})(?:[:](?P<sec>\d{2}))?(?:[Zz]|\.\d{3,}[Zz]?|(?:\.\d{3,})?(?P<off_sign>[+-])(?P<off_hh>\d{2}):(?P<off_mm>\d{2}))?\s*)?",
-        r"\s*(?P<day>\d{1,2})\s*,?\s*(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\s*\.?\s*,?\s*(?P<year>\d{4})\s*,?\s*(?:T?\s*(?P<hour>\d{1,2})[:.](?P<min>\d{2})(?:[:](?P<sec>\d{2}))?(?:[Zz]|\.\d{3,}[Zz]?|(?:\.\d{3,})?(?P<off_sign>[+-])(?P<off_hh>\d{2}):(?P<off_mm>\d{2}))?\s*)?",
-    )
-
-    for pattern in patterns:
-        if match := re.fullmatch(pattern, s, re.I):
-            if only_check:
-                return True
-
-            groups = match.groupdict()
-            group_numbers = {k: fill(v) for k, v in groups.items()}
-
-            year = group_numbers.get("year")
-            month = group_numbers.get("month")
-            day = group_numbers.get("day")
-            hour = group_numbers.get("hour")
-            min = group_numbers.get("min")
-            sec = group_numbers.get("sec")
-
-            off_sign = groups.get("off_sign")
-            off_hh = groups.get("off_hh")
-            off_mm = groups.get("off_mm")
-
-            if all((off_sign, off_hh, off_mm)):
-                tzone = datetime.strptime(f"{off_sign}{off_hh}:{off_mm}", "%z").tzinfo
-            else:
-                tzone = pytz.timezone(tzone)
-
-            try:
-                if only_date:
-                    if tzone_aware:
-                        try:
-                            return tzone.localize(datetime(year, month, day))
-                        except AttributeError:
-                            return datetime(year, month, day, tzinfo=tzone)
-                    else:
-                        return datetime(year, month, day)
-
-                else:
-                    if tzone_aware:
-                        try:
-                            return tzone.localize(
-                                datetime(year, month, day, hour, min, sec)
-                            )
-                        except AttributeError:
-                            return datetime(
-                                year, month, day, hour, min, sec, tzinfo=tzone
-                            )
-                    else:
-                        return datetime(year, month, day, hour, min, sec)
-
-            except Exception as e:
-                if only_check:
-                    return True
-                raise JSONSingletonException(
-                    f"Error on introduced datetime. {e}"
-                ) from None
+    if not isinstance(s, str):
+        raise TypeError(f"Argument s must be a str, date or datetime instance, not {type(s)}")
 
-    if only_check:
-        return False
-    raise JSONSingletonException(f"Can't parse target datetime: {s}")
+    # cached results are keyed by plain strings, since JSONStr comparisons parse datetimes
+    result, error = _parse_datetime_string(str.__str__(s), only_check, tzone_aware, only_date, tzone)
+    if error is not None:
+        raise JSONSingletonException(error) from None
+    return result
 
 
 @catch_exceptions
@@ -636,6 +674,173 @@ def parse_bool(s, fail_silently=False):
         raise JSONSingletonException(f"Can't parse target bool: {s}")
 
 
+# ---- BATCH PARSING ----
+_BOOL_STRINGS = {"True": True, "False": False}
+
+
+def _try_parse(func, value, **kwargs):
+    try:
+        return func(value, **kwargs)
+    except Exception:
+        return None
+
+
+def _parse_distinct(values, parse_string, parse_value, parsed=None):
+    """
+    Parse a list of values, calling parse_string once for each distinct string, and parse_value
+    for any other value. Strings already in the parsed dict are not parsed again.
+    Strings are keyed by plain str, since JSONStr comparisons parse datetimes.
+    """
+
+    parsed = {} if parsed is None else parsed
+    results = []
+    for value in values:
+        if isinstance(value, str):
+            value = str.__str__(value)
+            try:
+                result = parsed[value]
+            except KeyError:
+                result = parsed[value] = parse_string(value)
+        else:
+            result = parse_value(value)
+        results.append(result)
+    return results
+
+
+def parse_float_many(values, decimal_sep=None, thousands_sep=None, units_factor_dict=None):
+    """
+    Parse a sequence (or QuerySet) of values as parse_float does. Returns a float numpy array,
+    with NaN where values can't be parsed, if numpy is installed, or a list with None otherwise.
+    Columns of plain numbers are cast at once, otherwise repeated strings are parsed once.
+    """
+
+    values = list(values)
+    numpy = Numpy()
+    if numpy is not None and all(isinstance(value, str) for value in values):
+        try:  # numpy casts objects by float, what parse_float tries first
+            return numpy.array(values, dtype=object).astype(numpy.float64)
+        except ValueError:
+            pass
+
+    kwargs = dict(
+        decimal_sep=decimal_sep, thousands_sep=thousands_sep, units_factor_dict=units_factor_dict
+    )
+
+    def parse_string(s):
+        try:
+            return float(s)  # what parse_float tries first
+        except ValueError:
+            return _try_parse(parse_float, s, **kwargs)
+
+    results = _parse_distinct(
+        values, parse_string, lambda value: _try_parse(parse_float, value, **kwargs)
+    )
+
+    if numpy is None:
+        return results
+    return numpy.array([numpy.nan if i is None else i for i in results], dtype=numpy.float64)
+
+
+def parse_bool_many(values):
+    """
+    Parse a sequence (or QuerySet) of values as parse_bool does. Returns a numpy masked array of
+    booleans, where values that can't be parsed are masked, if numpy is installed,
+    or a list with None otherwise.
+    """
+
+    results = _parse_distinct(
+        list(values),
+        lambda s: _BOOL_STRINGS.get(s.strip().lower().capitalize()),
+        lambda value: _try_parse(parse_bool, value),
+    )
+
+    numpy = Numpy()
+    if numpy is None:
+        return results
+    return numpy.ma.masked_array(
+        [bool(i) for i in results], mask=[i is None for i in results], dtype=bool
+    )
+
+
+def _iso_datetimes_to_array(strings, tzone_aware, only_date, tzone):
+    """
+    Cast ISO 8601 strings to a datetime64[s] numpy array (in UTC if tzone_aware) in bulk,
+    as parse_datetime parses them. Returns None if any of them must be parsed one by one.
+    """
+
+    numpy = Numpy()
+    if tzone_aware and _timezone(tzone) is not pytz.utc:
+        return None
+    days, offsets = [], []
+    for s in strings:
+        day, time, zone = _ISO_DATETIME.fullmatch(s).groups()
+        days.append(day if only_date or time is None else f"{day}T{time}")
+        offset = 0
+        if zone and zone not in "Zz":
+            hours, minutes = int(zone[1:3]), int(zone[4:6])
+            if hours > 23 or minutes > 59:  # not a valid offset, even if it is ignored
+                return None
+            if tzone_aware:
+                offset = (1 if zone[0] == "+" else -1) * (hours * 60 + minutes)
+        offsets.append(offset)
+    try:
+        result = numpy.array(days, dtype="datetime64[s]")
+    except ValueError:  # like a wrong month
+        return None
+    if any(offsets):
+        result = result - numpy.array(offsets, dtype="timedelta64[m]")
+    return result
+
+
+def parse_datetime_many(values, tzone_aware=True, only_date=False, tzone="utc"):
+    """
+    Parse a sequence (or QuerySet) of values as parse_datetime does. If numpy is installed,
+    returns a datetime64[s] numpy array, with NaT where values can't be parsed.
+    Aware datetimes are converted to UTC. Otherwise, returns a list of datetimes, with None.
+    Repeated strings are parsed once, and ISO 8601 strings are cast in bulk.
+    """
+
+    values = list(values)
+    numpy = Numpy()
+    kwargs = dict(tzone_aware=tzone_aware, only_date=only_date, tzone=tzone)
+
+    parsed = {}
+    if numpy is not None:
+        # numpy accepts the year 0, which datetime can't represent
+        iso_strings = {
+            str.__str__(value): None
+            for value in values
+            if isinstance(value, str)
+            and _ISO_DATETIME.fullmatch(value)
+            and int(value[:4]) >= MINYEAR
+        }
+        array = _iso_datetimes_to_array(iso_strings, tzone_aware, only_date, tzone)
+        if array is not None:
+            parsed = dict(zip(iso_strings, array))
+
+    def parse_value(value):
+        return _try_parse(parse_datetime, value, **kwargs)
+
+    results = _parse_distinct(values, parse_value, parse_value, parsed)
+
+    if numpy is None:
+        return results
+
+    def to_datetime64(value):
+        if value is None:
+            return numpy.datetime64("NaT")
+        if isinstance(value, datetime):
+            # converted to UTC by numpy, since the UTC datetime may be out of datetime range
+            offset = value.utcoffset()
+            value = numpy.datetime64(value.replace(tzinfo=None), "s")
+            if offset:
+                value -= numpy.timedelta64(int(offset.total_seconds()), "s")
+            return value
+        return value
+
+    return numpy.array([to_datetime64(i) for i in results], dtype="datetime64[s]")
+
+
 def parse_json(s, **kwargs):
     """Parse all jsons from a text string or URL"""
 
@@ -644,7 +849,7 @@ def parse_json(s, **kwargs):
     output = QuerySet(list_of_root_nodes=True)
 
     if url_validator(s):
-        req = retry_function(requests.get, s, **kwargs)
+        req = retry_function(http.get, s, **kwargs)
         s = req.text
 
     def extract_json_objects(text, decoder=JSONDecoder()):
@@ -736,19 +941,21 @@ def _to_django_model(
     return obj
 
 
-def url_validator(url, public=False, return_match=False, optative_protocol=False):
-    """
-    :param value: URL address string to validate
-    :param public: (default=False) Set True to only allow a public IP address
-    :param return_match: (default=False) Set True to return match instead of bool
-    """
+# ---- URL VALIDATION ----
+_URL_CACHE_SIZE = 4096
+_URL_PROTOCOLS = ("http://", "https://", "ftp://")
+
+
+@lru_cache(maxsize=None)
+def _url_pattern(optative_protocol):
+    """Compiled url pattern, with or without an optional protocol. It is built on first use"""
 
     ip_middle_octet = r"(?:\.(?:1?\d{1,2}|2[0-4]\d|25[0-5]))"
     ip_last_octet = r"(?:\.(?:0|[1-9]\d?|1\d\d|2[0-4]\d|25[0-5]))"
 
     prot = "?" if optative_protocol else ""
 
-    regex = re.compile(  # noqa: W605
+    return re.compile(  # noqa: W605
         r"^"
         # protocol identifier
         rf"(?:(?P<protocol>https?|ftp)://){prot}"
@@ -829,9 +1036,40 @@ def url_validator(url, public=False, return_match=False, optative_protocol=False
         re.UNICODE | re.IGNORECASE,
     )
 
-    pattern = re.compile(regex)
 
-    result = pattern.match(url)
+
+def _may_be_url(url, optative_protocol):
+    """
+    Cheap check which rejects most strings that the url pattern can't match: urls have a protocol
+    (unless it is optional), no spaces, and their host has a dot, or is an IPv6 or localhost
+    """
+
+    if not optative_protocol and not url[:8].casefold().startswith(_URL_PROTOCOLS):
+        return False
+    if " " in url:
+        return False
+    return "." in url or "[" in url or "localhost" in url.casefold()
+
+
+@lru_cache(maxsize=_URL_CACHE_SIZE)
+def _match_url(url, optative_protocol):
+    if not _may_be_url(url, optative_protocol):
+        return None
+    return _url_pattern(optative_protocol).match(url)
+
+
+def url_validator(url, public=False, return_match=False, optative_protocol=False):
+    """
+    :param value: URL address string to validate
+    :param public: (default=False) Set True to only allow a public IP address
+    :param return_match: (default=False) Set True to return match instead of bool
+    """
+
+    if isinstance(url, str):
+        # recent results are cached, keyed by plain strings
+        result = _match_url(str.__str__(url), bool(optative_protocol))
+    else:
+        result = _url_pattern(bool(optative_protocol)).match(url)
 
     if return_match:
         return result
@@ -1,11 +1,17 @@
+import asyncio
+import codecs
 import json
 import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from typing import Any, List, Tuple
+from typing import Any, Callable, List, Tuple
 
 import requests
 from jsonutils.exceptions import JSONDecodeException
+from jsonutils.functions.backends import json_loads
+from jsonutils.functions.compression import _decompress, _open_binary, _open_text
 from jsonutils.functions.parsers import url_validator
+from jsonutils.utils import http
 from jsonutils.utils.retry import retry_function
 
 
@@ -20,20 +26,301 @@ def _open_multiple_files(
     return results
 
 
-def _open_single_file(file: str, raise_exception: bool, **kwargs) -> Tuple[Any, str]:
+def _open_single_file(
+    file: str, raise_exception: bool, ndjson: bool = False, **kwargs
+) -> Tuple[Any, str]:
     file = str(file)
-    # decide whether to use requests.get or requests.post by checking kwargs
+    # decide whether to use a get or post request by checking kwargs
     if kwargs.get("json") or kwargs.get("data"):
-        FUNCTION = requests.post
+        FUNCTION = http.post
     else:
-        FUNCTION = requests.get
+        FUNCTION = http.get
     if url_validator(file):
         req = retry_function(FUNCTION, file, raise_exception=raise_exception, **kwargs)
+        if ndjson:
+            data = list(_iter_ndjson_lines(_decompress(req.content).splitlines()))
+        else:
+            try:
+                data = json_loads(_decompress(req.content))
+            except Exception as e:
+                raise JSONDecodeException(f"Selected URL has no valid json file. Details: {e}")
+    elif ndjson:
+        data = list(_iterparse_ndjson(file))
+    else:
+        with _open_binary(file) as f:
+            data = json_loads(f.read())
+    return data, file
+
+
+def _iter_ndjson_lines(lines):
+    """Decode an iterable of NDJSON lines, yielding the json value of each non-empty line"""
+
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json_loads(line)
+        except ValueError as e:
+            raise JSONDecodeException(
+                f"Error when parsing line {number} of the NDJSON data. Error message: {e}"
+            )
+
+
+def _iterparse_ndjson(file):
+    """
+    Incrementally parse a NDJSON file (a path or a file object), yielding its records one by one.
+    Files given by path are read as bytes (decompressing them if needed), which the json
+    backend decodes directly. Lines are read through the file buffer, so only the current
+    record is kept in memory.
+    """
+
+    if hasattr(file, "read"):
+        yield from _iter_ndjson_lines(file)
+    else:
+        with _open_binary(file) as f:
+            yield from _iter_ndjson_lines(f)
+
+
+class _AsyncOpen:
+    """
+    Concurrent loader of files and urls, as returned by JSONObject.aopen.
+    Urls are fetched by worker threads over a shared connection pool, with at most
+    `concurrency` documents being loaded at a time. Documents bigger than `parse_threshold`
+    bytes are decoded and built by the worker threads too, so the event loop is not blocked.
+    Awaiting it returns the built objects in the input order, while iterating it
+    asynchronously yields them as soon as each one is loaded.
+    """
+
+    def __init__(
+        self,
+        file_list: List[str],
+        build: Callable[[Any, str], Any],
+        raise_exception: bool = True,
+        concurrency: int = 10,
+        parse_threshold: int = 2 ** 20,
+        ndjson: bool = False,
+        **kwargs,
+    ):
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be a positive integer, not {concurrency}")
+        self._file_list = [str(file) for file in file_list]
+        self._build = build
+        self._raise_exception = raise_exception
+        self._concurrency = concurrency
+        self._parse_threshold = parse_threshold
+        self._ndjson = ndjson
+        self._kwargs = kwargs
+
+    def _read(self, session: requests.Session, file: str) -> bytes:
+        """Read the raw content of a file or url. It runs in a worker thread"""
+
+        if not url_validator(file):
+            with _open_binary(file) as f:
+                return f.read()
+        kwargs = self._kwargs
+        method = http.post if kwargs.get("json") or kwargs.get("data") else http.get
+        req = retry_function(
+            method, file, session=session, raise_exception=self._raise_exception, **kwargs
+        )
         try:
-            data = req.json()
+            return _decompress(req.content)
         except Exception as e:
             raise JSONDecodeException(f"Selected URL has no valid json file. Details: {e}")
+
+    def _parse(self, content: bytes, file: str) -> Any:
+        """Decode the content of a file and build its object"""
+
+        if self._ndjson:
+            data = list(_iter_ndjson_lines(content.splitlines()))
+        else:
+            try:
+                data = json_loads(content)
+            except Exception as e:
+                raise JSONDecodeException(f"{file} has no valid json data. Details: {e}")
+        return self._build(data, file)
+
+    async def _load(self, loop, executor, session, semaphore, position: int, file: str):
+        async with semaphore:
+            content = await loop.run_in_executor(executor, self._read, session, file)
+            if len(content) > self._parse_threshold:
+                obj = await loop.run_in_executor(executor, self._parse, content, file)
+            else:
+                obj = self._parse(content, file)
+        return position, obj
+
+    async def _iter_loaded(self):
+        """Yield (position, object) pairs in completion order"""
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self._concurrency)
+        # a session built by http.new_session, so its GET requests can be cached and coalesced
+        with ThreadPoolExecutor(self._concurrency) as executor, http.new_session(
+            self._concurrency
+        ) as session:
+            tasks = [
+                loop.create_task(self._load(loop, executor, session, semaphore, position, file))
+                for position, file in enumerate(self._file_list)
+            ]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def __aiter__(self):
+        async for _, obj in self._iter_loaded():
+            yield obj
+
+    async def _collect(self) -> List[Any]:
+        output = [None] * len(self._file_list)
+        async for position, obj in self._iter_loaded():
+            output[position] = obj
+        return output
+
+    def __await__(self):
+        return self._collect().__await__()
+
+
+class _JSONStream:
+    """
+    A buffered reader over a text stream, which decodes json values one by one.
+    Only the current value (and the unread part of the last chunk) is kept in memory.
+    """
+
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self, fp, chunk_size: int = 2 ** 16):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        # binary streams are decoded incrementally, since a character may be split between chunks
+        self._bytes_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def _fill(self, size: int = None) -> bool:
+        """Read a new chunk, discarding the consumed part of the buffer. Returns False at the end of the stream"""
+        if self._eof:
+            return False
+        chunk = self._fp.read(size or self._chunk_size)
+        while isinstance(chunk, bytes):
+            text = self._bytes_decoder.decode(chunk, final=not chunk)
+            if text or not chunk:
+                chunk = text
+                break
+            # only part of a character was read
+            chunk = self._fp.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespaces and return the next character, without consuming it (empty string at the end)"""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            length = len(buffer)
+            while pos < length and buffer[pos] in self._WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < length:
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of chars"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise JSONDecodeException(
+                f"Error when parsing the json stream. Expected one of {tuple(chars)}, found {char!r}"
+            )
+        self._pos += 1
+        return char
+
+    def read_value(self) -> Any:
+        """Decode the next json value"""
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                error = e
+            else:
+                # a value ending at the end of the buffer might be incomplete (like a number)
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+                error = None
+            # the value may be split between chunks, so read more data and try again
+            if not self._fill(size):
+                if error is None:
+                    self._pos = end
+                    return value
+                raise JSONDecodeException(f"Error when parsing the json stream. Error message: {error}")
+            size *= 2  # grow reads, so big values are not decoded again too many times
+
+
+def _iter_stream_path(stream: _JSONStream, path: tuple, prefix: tuple = ()):
+    """
+    Yield (path, value) pairs for every json value of the stream located at path.
+    A "*" item in path matches every key of an object or index of an array.
+    """
+
+    if not path:
+        yield prefix, stream.read_value()
+        return
+
+    target, path = path[0], path[1:]
+    char = stream.peek()
+    if char == "{":
+        stream.expect("{")
+        if stream.peek() == "}":
+            stream.expect("}")
+            return
+        while True:
+            key = stream.read_value()
+            if not isinstance(key, str):
+                raise JSONDecodeException("Error when parsing the json stream. Keys must be strings")
+            stream.expect(":")
+            if target == "*" or str(target) == key:
+                yield from _iter_stream_path(stream, path, prefix + (key,))
+            else:
+                stream.read_value()
+            if stream.expect(",}") == "}":
+                return
+    elif char == "[":
+        stream.expect("[")
+        if stream.peek() == "]":
+            stream.expect("]")
+            return
+        index = 0
+        while True:
+            if target == "*" or target == index:
+                yield from _iter_stream_path(stream, path, prefix + (index,))
+            else:
+                stream.read_value()
+            if stream.expect(",]") == "]":
+                return
+            index += 1
+    else:  # a singleton value has no children matching the path
+        stream.read_value()
+
+
+def _iterparse_file(file, path: tuple, chunk_size: int = 2 ** 16):
+    """
+    Incrementally parse a json file (a path or a file object, which may be compressed),
+    yielding the (path, value) pairs found at path
+    """
+
+    if hasattr(file, "read"):
+        yield from _iter_stream_path(_JSONStream(file, chunk_size), path)
     else:
-        with open(file) as f:
-            data = json.load(f)
-    return data, file
+        with _open_text(file) as f:
+            yield from _iter_stream_path(_JSONStream(f, chunk_size), path)
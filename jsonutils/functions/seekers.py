@@ -239,6 +239,25 @@ def _eval_object(obj, iterable):
     return reduce(getitem, iterable, obj)
 
 
+def _iter_nodes(obj, recursive=True):
+    """
+    Iterate over the children of a composed object, in depth-first pre-order.
+    An explicit stack of child iterators is used instead of recursion,
+    so there is no limit on the nesting level of obj.
+    If recursive is False, only the direct children of obj are returned.
+    """
+
+    stack = [iter(obj._child_objects.values())]
+    while stack:
+        for child in stack[-1]:
+            yield child
+            if recursive and child.is_composed:
+                stack.append(iter(child._child_objects.values()))
+                break
+        else:
+            stack.pop()
+
+
 def _set_object(obj, iterable, value):
     """
     The generalization of setitem for nested paths.
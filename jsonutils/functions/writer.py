@@ -0,0 +1,315 @@
+import json
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+from json.encoder import encode_basestring, encode_basestring_ascii
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from jsonutils.functions.backends import (
+    _orjson_encode,
+    _orjson_option,
+    _padding,
+    _reindent,
+    json_dump,
+    json_dumps,
+)
+from jsonutils.functions.compression import _compression_from_path, _open_text
+
+# containers whose json text is estimated to take at most _BATCH_SIZE characters are encoded
+# at once. Bigger ones are walked item by item, so every encoded part is bounded
+_BATCH_SIZE = 2 ** 16
+# encoded characters kept before writing them to the file
+_BUFFER_SIZE = 2 ** 16
+# json.dumps kwargs supported by the streaming encoder
+_STREAM_KWARGS = ("separators", "sort_keys")
+
+
+def _iter_chunks(iterable: Iterable, size: int):
+    """Split an iterable into lists of, at most, size items"""
+
+    if size < 1:
+        raise ValueError(f"Chunk size must be a positive integer, not {size}")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _encode_float(value: float) -> str:
+    if value != value:
+        return "NaN"
+    elif value == float("inf"):
+        return "Infinity"
+    elif value == float("-inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def _estimated_size(value: Any, limit: int) -> int:
+    """
+    Estimate the length of the json text of native data or nodes, counting strings by their length
+    and other scalars as 8 characters. It stops once limit is exceeded. Lazy nodes are not
+    materialized, since their raw children are counted as they are.
+    """
+
+    size = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            size += len(value) + 2
+        elif isinstance(value, dict):
+            size += 2
+            for key, child in dict.items(value):
+                size += (len(key) if key.__class__ is str else 8) + 4
+                stack.append(child)
+                if size > limit:
+                    return size
+        elif isinstance(value, list):
+            size += 2
+            for child in list.__iter__(value):
+                size += 1
+                stack.append(child)
+                if size > limit:
+                    return size
+        else:
+            size += 8
+        if size > limit:
+            return size
+    return size
+
+
+def _iter_json_chunks(
+    data: Any,
+    indent: Optional[int] = None,
+    ensure_ascii: bool = False,
+    separators: Optional[tuple] = None,
+    sort_keys: bool = False,
+) -> Iterator[str]:
+    """
+    Encode native python data, or a node (or a list of nodes), yielding the json text in chunks.
+    The output is the same as json.dumps of its native data, but containers are walked with an
+    explicit stack, so only a bounded text is buffered. Containers whose text is estimated to take
+    at most _BATCH_SIZE characters are encoded at once, by orjson if it is selected and supports
+    the output format (then, floats in exponent notation are formatted like 1e16 instead of 1e+16).
+    The native data of those containers is built without caching it in their nodes.
+    """
+    from jsonutils.base import JSONCompose, QuerySet, _encodable_data, _json_key
+
+    if separators is None:
+        separators = (",", ": ") if indent is not None else (", ", ": ")
+    item_separator, key_separator = separators
+    padding = _padding(indent)
+    encode_str = encode_basestring_ascii if ensure_ascii else encode_basestring
+    # orjson only indents with 2 spaces, so its output is reindented for other indents
+    orjson_option = _orjson_option(indent, separators=separators, sort_keys=sort_keys)
+    encoder = json.JSONEncoder(
+        ensure_ascii=ensure_ascii, indent=indent, separators=separators, sort_keys=sort_keys
+    )
+    leaf_encoders = {
+        str: encode_str,
+        int: int.__repr__,
+        float: _encode_float,
+        bool: lambda value: "true" if value else "false",
+        type(None): lambda value: "null",
+    }
+
+    def encode_with_orjson(value):
+        output = _orjson_encode(value, orjson_option, ensure_ascii)
+        if output is None:
+            return None
+        text = output.decode("utf-8")
+        return _reindent(text, padding) if padding is not None and padding != "  " else text
+
+    parts = []
+    stack = []
+
+    def add(value, depth):
+        """
+        Append value to the parts if it is encoded at once, or push it to the stack.
+        Returns the length of the appended text
+        """
+
+        encode = leaf_encoders.get(value.__class__)
+        if encode is not None:
+            text = encode(value)
+            parts.append(text)
+            return len(text)
+        is_node = isinstance(value, (JSONCompose, QuerySet))
+        if not is_node and value.__class__ is not dict and value.__class__ is not list:
+            return add(_encodable_data(value, use_cache=False), depth)  # leaf nodes and raw data
+        if isinstance(value, JSONCompose) and "_data_cache" in value.__dict__:
+            value, is_node = value.__dict__["_data_cache"], False
+        is_dict = isinstance(value, dict)
+        if not value:
+            parts.append("{}" if is_dict else "[]")
+            return 2
+        if _estimated_size(value, _BATCH_SIZE) <= _BATCH_SIZE:
+            if is_node:
+                value = _encodable_data(value, use_cache=False)
+            text = encode_with_orjson(value) if orjson_option is not None else None
+            if text is None:
+                text = encoder.encode(value)
+            parts.append(text.replace("\n", "\n" + padding * depth) if padding else text)
+            return len(parts[-1])
+        parts.append("{" if is_dict else "[")
+        if is_dict:
+            items = ((k if k.__class__ is str else _json_key(k), v) for k, v in value.items())
+            items = iter(sorted(items, key=itemgetter(0)) if sort_keys else items)
+        else:
+            items = iter(value)
+        stack.append([items, is_dict, depth + 1, True])
+        return 1
+
+    buffered = add(data, 0)
+    while stack:
+        frame = stack[-1]
+        items, is_dict, depth, first = frame
+        newline = "\n" + padding * depth if padding is not None else ""
+        for item in items:
+            if first:
+                frame[3] = first = False
+                parts.append(newline)
+            else:
+                parts.append(item_separator + newline)
+            if is_dict:
+                key, item = item
+                parts.append(encode_str(key) + key_separator)
+                buffered += len(key)
+            size = len(stack)
+            buffered += add(item, depth) + len(newline)
+            if buffered >= _BUFFER_SIZE:
+                yield "".join(parts)
+                parts.clear()
+                buffered = 0
+            if len(stack) > size:  # go on with the children of this item
+                break
+        else:
+            stack.pop()
+            closing = "}" if is_dict else "]"
+            parts.append("\n" + padding * (depth - 1) + closing if padding is not None else closing)
+    yield "".join(parts)
+
+
+def _fsync_directory(path):
+    """Flush a directory entry to disk, so a rename inside it is durable (not supported on Windows)"""
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def _atomic_path(path):
+    """
+    Give a temporary path next to path. If the block succeeds, the temporary file is flushed
+    to disk and renamed to path, so path never holds a partially written file.
+    Symbolic links are followed, so their target is replaced, and the mode of an existing
+    file is kept.
+    """
+
+    path = Path(os.path.realpath(path))
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+    try:
+        yield temp_path
+        with open(temp_path, "rb+") as file:
+            os.fsync(file.fileno())
+        if path.exists():
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+        _fsync_directory(path.parent)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+
+def _write_ndjson(
+    records: Iterable[Any],
+    path,
+    append: bool = False,
+    create_path: bool = True,
+    ensure_ascii: bool = False,
+    chunk_size: int = 1000,
+    compression: Optional[str] = "infer",
+    **kwargs,
+) -> int:
+    """
+    Write records to a NDJSON file, one json value per line, and return the number of records written.
+    Records are encoded and written in chunks, so the whole output is never built in memory.
+    A compressed file is written if compression is selected or inferred from the path extension.
+    Unless records are appended, the file is replaced atomically once it is complete.
+    Extra kwargs are passed to the json encoder.
+    """
+    from jsonutils.base import _encodable_data
+
+    if kwargs.get("indent") is not None:
+        raise ValueError("NDJSON records can't be indented")
+    kwargs.pop("indent", None)
+
+    if create_path:
+        Path(path).resolve().parent.mkdir(parents=True, exist_ok=True)
+    if compression == "infer":
+        compression = _compression_from_path(path)
+
+    def write(target, mode):
+        written = 0
+        with _open_text(target, mode, compression) as file:
+            for chunk in _iter_chunks(records, chunk_size):
+                # records are encoded without caching their native data in the nodes
+                data = [_encodable_data(record, use_cache=False) for record in chunk]
+                file.writelines(
+                    [json_dumps(i, ensure_ascii=ensure_ascii, **kwargs) + "\n" for i in data]
+                )
+                written += len(chunk)
+        return written
+
+    if append:
+        return write(path, "a")
+    with _atomic_path(path) as temp_path:
+        return write(temp_path, "w")
+
+
+def _write_json(
+    obj: Any,
+    path,
+    create_path: bool = True,
+    ensure_ascii: bool = False,
+    indent: int = 4,
+    compression: Optional[str] = "infer",
+    **kwargs,
+) -> None:
+    """
+    Write a node, or a list of nodes, to a json file, which is compressed
+    if compression is selected or inferred from the path extension.
+    The output is encoded as a stream into a temporary file, which replaces path atomically
+    once it is complete.
+    """
+    from jsonutils.base import _encodable_data
+
+    if create_path:
+        Path(path).resolve().parent.mkdir(parents=True, exist_ok=True)
+    if compression == "infer":
+        compression = _compression_from_path(path)
+
+    with _atomic_path(path) as temp_path, _open_text(temp_path, "w", compression) as file:
+        if all(key in _STREAM_KWARGS for key in kwargs):
+            # the node tree is walked directly, so its native data is not built as a whole
+            for chunk in _iter_json_chunks(obj, indent=indent, ensure_ascii=ensure_ascii, **kwargs):
+                file.write(chunk)
+        else:  # other encoder options are handled by the json backend
+            data = _encodable_data(obj, use_cache=False)
+            json_dump(data, file, ensure_ascii=ensure_ascii, indent=indent, **kwargs)
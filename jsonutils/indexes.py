@@ -0,0 +1,454 @@
+"""
+Indexes of root documents, which let queries jump straight to their candidate nodes
+instead of visiting every node of the document.
+"""
+import weakref
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime
+
+import jsonutils.base as base
+from jsonutils.cache import _parser_settings
+from jsonutils.functions.parsers import _STEP_ACTION, parse_datetime, parse_float
+from jsonutils.functions.seekers import _iter_nodes
+
+# id of root node -> its KeyIndex. Entries are removed when their root is garbage collected
+_KEY_INDEXES = {}
+# an index is not used if candidates are more than 1/_MAX_CANDIDATES_RATIO of the indexed nodes
+_MAX_CANDIDATES_RATIO = 4
+
+
+class KeyIndex:
+    """
+    Inverted index of a root document: it maps each key to the nodes which have it.
+    It is maintained incrementally when children are set or removed. Other mutations mark it
+    as stale, and it is rebuilt the next time a query needs it.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.value_indexes = {}  # key -> {kind: ValueIndex}
+        self.rebuild()
+
+    def rebuild(self):
+        self._nodes = defaultdict(dict)  # key -> {id of node: node}
+        self.stale = False
+        value_indexes, self.value_indexes = self.value_indexes, {}
+        self.add(self.root)
+        self.value_indexes = value_indexes
+        for key, indexes in value_indexes.items():
+            for index in indexes.values():
+                index.rebuild(self._nodes.get(key, {}).values())
+
+    def add(self, node):
+        """Register a node and all its descendants"""
+
+        nodes = self._nodes
+        items = _iter_nodes(node) if node.is_composed else ()
+        if node is not self.root:
+            items = (node, *items)
+        for item in items:
+            if item._key is not None:
+                nodes[item._key][id(item)] = item
+                for index in self.value_indexes.get(item._key, {}).values():
+                    index.add(item)
+
+    def remove(self, node):
+        """Unregister a node and all its descendants"""
+
+        nodes = self._nodes
+        for item in (node, *_iter_nodes(node)) if node.is_composed else (node,):
+            entries = nodes.get(item._key)
+            if entries is not None:
+                entries.pop(id(item), None)
+                if not entries:
+                    del nodes[item._key]
+                for index in self.value_indexes.get(item._key, {}).values():
+                    index.remove(item)
+
+    def add_value_index(self, key, kind):
+        """Index the values of the nodes with this key"""
+
+        if kind not in _VALUE_INDEXES:
+            raise ValueError(f"Index kind must be one of {tuple(_VALUE_INDEXES)}, not {kind!r}")
+        if self.stale:
+            self.rebuild()
+        index = _VALUE_INDEXES[kind]()
+        index.rebuild(self._nodes.get(key, {}).values())
+        self.value_indexes.setdefault(key, {})[kind] = index
+        return index
+
+    def candidates(self, plan):
+        """
+        Nodes which may match a compiled query, or None if the query can't use this index:
+        those with the target key of a QueryPlan, or with a key which fullmatch the pattern of a KeyQueryPlan
+        """
+
+        if self.stale:
+            self.rebuild()
+        pattern = getattr(plan, "pattern", None)
+        if pattern is not None:
+            candidates = [
+                node
+                for key, entries in self._nodes.items()
+                if isinstance(key, str) and pattern.fullmatch(key)
+                for node in entries.values()
+            ]
+        elif plan.target_key is not None and plan.lookups:
+            candidates = self._value_candidates(plan)
+            if candidates is None:
+                candidates = list(self._nodes.get(plan.target_key, {}).values())
+        else:
+            return None
+        # matching many candidates and sorting them is slower than visiting every node
+        if len(candidates) * _MAX_CANDIDATES_RATIO > sum(map(len, self._nodes.values())):
+            return None
+        return candidates
+
+    def _value_candidates(self, plan):
+        """
+        The smallest set of candidates given by the value indexes of the target key for the lookups
+        of a query, or None if no lookup can use them
+        """
+
+        indexes = self.value_indexes.get(plan.target_key)
+        if not indexes:
+            return None
+        settings = _parser_settings()
+        best = None
+        for steps, query_value in plan.lookups:
+            # only lookups made of a single action on the node itself, like price__gt
+            if len(steps) != 1 or steps[0][0] != _STEP_ACTION:
+                continue
+            action = steps[0][1].__name__[: -len("_action")]
+            for index in indexes.values():
+                if index.settings != settings:  # values must be parsed again
+                    index.rebuild(self._nodes.get(plan.target_key, {}).values())
+                candidates = index.candidates(action, query_value)
+                if candidates is not None and (best is None or len(candidates) < len(best)):
+                    best = candidates
+        return best
+
+
+def _value_keys(node):
+    """
+    Normalised keys of the value of a node, as (domain, key) pairs. Keys of a domain can be compared
+    between them, and they are the values compared by the rich comparison methods of the node.
+    Nodes which can't be compared like scalars (bools, nulls, composed nodes) get the ("other", None) key.
+    """
+
+    if isinstance(node, base.JSONStr):
+        keys = [("str", str.__str__(node))]
+        try:
+            number = node.to_float()
+        except Exception:
+            pass
+        else:
+            if number == number:
+                keys.append(("number", number))
+        try:
+            value = node.to_datetime()
+        except Exception:
+            pass
+        else:
+            keys.append(("datetime" if value.tzinfo is not None else "naive datetime", value))
+        return keys
+    elif isinstance(node, (base.JSONInt, base.JSONFloat)):
+        number = float(node)
+        return [("number", number)] if number == number else []
+    return [("other", None)]
+
+
+def _query_keys(query_value):
+    """
+    Normalised keys which a node must have in order to compare equal to query_value,
+    or None if they can't be known (then the index can't be used)
+    """
+
+    if isinstance(query_value, bool):
+        return None
+    elif isinstance(query_value, (int, float)):
+        return [("number", query_value)] if query_value == query_value else []
+    elif isinstance(query_value, (date, datetime)):
+        value = parse_datetime(query_value)
+        return [("datetime" if value.tzinfo is not None else "naive datetime", value)]
+    elif isinstance(query_value, str):
+        keys = [("str", query_value)]
+        # numeric nodes are compared with the parsed number of string query values
+        try:
+            number = parse_float(query_value)
+        except Exception:
+            pass
+        else:
+            if number == number:
+                keys.append(("number", number))
+        if parse_datetime(query_value, only_check=True):
+            value = parse_datetime(query_value)
+            keys.append(("datetime" if value.tzinfo is not None else "naive datetime", value))
+        return keys
+    return None
+
+
+class ValueIndex:
+    """
+    Base class of the indexes of the values of the nodes with a given key.
+    Candidates given by an index are a superset of the nodes which match a lookup,
+    so they must be checked by the query afterwards.
+    """
+
+    def __init__(self):
+        self._keys = {}  # id of node -> its (domain, key) pairs
+        self._others = {}  # id of node -> node, for nodes of the "other" domain
+        self.settings = _parser_settings()
+
+    def rebuild(self, nodes):
+        self._keys.clear()
+        self._others.clear()
+        self.settings = _parser_settings()
+        for node in nodes:
+            keys = self._keys[id(node)] = _value_keys(node)
+            if ("other", None) in keys:
+                self._others[id(node)] = node
+
+    def add(self, node):
+        keys = self._keys[id(node)] = _value_keys(node)
+        if ("other", None) in keys:
+            self._others[id(node)] = node
+        return keys
+
+    def remove(self, node):
+        self._others.pop(id(node), None)
+        return self._keys.pop(id(node), ())
+
+    def candidates(self, action, query_value):
+        """Candidates for a lookup, or None if this index can't answer it"""
+        if action == "exact":
+            keys = _query_keys(query_value)
+        elif action == "in" and isinstance(query_value, (list, tuple)):
+            keys = []
+            for item in query_value:
+                # nulls and composed values are compared with the nodes of the "other" domain
+                if item is None or isinstance(item, (dict, list, tuple)):
+                    continue
+                item_keys = _query_keys(item)
+                if item_keys is None:
+                    return None
+                keys.extend(item_keys)
+        else:
+            return None
+        if keys is None:
+            return None
+        nodes = self._equal(keys)
+        nodes.update(self._others)
+        return list(nodes.values())
+
+    def _equal(self, keys):
+        """Nodes with any of these keys, indexed by their ids"""
+        raise NotImplementedError
+
+
+class HashIndex(ValueIndex):
+    """Index which answers exact and in lookups with a hash table of value keys"""
+
+    def __init__(self):
+        super().__init__()
+        self._nodes = defaultdict(dict)  # (domain, key) -> {id of node: node}
+
+    def rebuild(self, nodes):
+        self._nodes.clear()
+        super().rebuild(nodes)
+        for node in nodes:
+            for key in self._keys[id(node)]:
+                self._nodes[key][id(node)] = node
+
+    def add(self, node):
+        for key in super().add(node):
+            self._nodes[key][id(node)] = node
+
+    def remove(self, node):
+        for key in super().remove(node):
+            entries = self._nodes.get(key)
+            if entries is not None:
+                entries.pop(id(node), None)
+                if not entries:
+                    del self._nodes[key]
+
+    def _equal(self, keys):
+        nodes = {}
+        for key in keys:
+            try:
+                nodes.update(self._nodes.get(key, {}))
+            except TypeError:  # unhashable key
+                pass
+        return nodes
+
+
+class SortedIndex(ValueIndex):
+    """
+    Index which keeps the value keys of every domain in sorted order, so it answers range lookups
+    (gt, gte, lt, lte) by bisection, and exact and in lookups too
+    """
+
+    _RANGES = {
+        "gt": lambda keys, key: (bisect_right(keys, key), len(keys)),
+        "gte": lambda keys, key: (bisect_left(keys, key), len(keys)),
+        "lt": lambda keys, key: (0, bisect_left(keys, key)),
+        "lte": lambda keys, key: (0, bisect_right(keys, key)),
+        "exact": lambda keys, key: (bisect_left(keys, key), bisect_right(keys, key)),
+    }
+
+    def __init__(self):
+        super().__init__()
+        self._sorted = {}  # domain -> (sorted list of keys, list of nodes in the same order)
+
+    def rebuild(self, nodes):
+        nodes = list(nodes)
+        super().rebuild(nodes)
+        pairs = defaultdict(list)
+        for node in nodes:
+            for domain, key in self._keys[id(node)]:
+                if domain != "other":
+                    pairs[domain].append((key, node))
+        self._sorted = {}
+        for domain, items in pairs.items():
+            items.sort(key=lambda item: item[0])
+            self._sorted[domain] = ([key for key, _ in items], [node for _, node in items])
+
+    def add(self, node):
+        for domain, key in super().add(node):
+            if domain != "other":
+                keys, nodes = self._sorted.setdefault(domain, ([], []))
+                position = bisect_right(keys, key)
+                keys.insert(position, key)
+                nodes.insert(position, node)
+
+    def remove(self, node):
+        for domain, key in super().remove(node):
+            if domain == "other" or domain not in self._sorted:
+                continue
+            keys, nodes = self._sorted[domain]
+            for position in range(bisect_left(keys, key), bisect_right(keys, key)):
+                if nodes[position] is node:
+                    del keys[position], nodes[position]
+                    break
+
+    def _range(self, action, domain, key):
+        if domain not in self._sorted:
+            return []
+        keys, nodes = self._sorted[domain]
+        start, end = self._RANGES[action](keys, key)
+        return nodes[start:end]
+
+    def _equal(self, keys):
+        return {id(node): node for key in keys for node in self._range("exact", *key)}
+
+    def candidates(self, action, query_value):
+        if action not in ("gt", "gte", "lt", "lte"):
+            return super().candidates(action, query_value)
+        keys = _query_keys(query_value)
+        if keys is None:
+            return None
+        # nodes of the "other" domain never satisfy a range lookup of a scalar value
+        nodes = {id(node): node for key in keys for node in self._range(action, *key)}
+        return list(nodes.values())
+
+
+_VALUE_INDEXES = {"sorted": SortedIndex, "hash": HashIndex}
+
+
+def _root_of(node):
+    """Root of a composed node. Parents are read from __dict__, since unpickled nodes may not have them yet"""
+    parent = node.__dict__.get("parent")
+    while parent is not None:
+        node = parent
+        parent = node.__dict__.get("parent")
+    return node
+
+
+def build_index(node):
+    """Build the key index of the root document of node, replacing the existing one"""
+
+    root = _root_of(node)
+    if id(root) not in _KEY_INDEXES:
+        weakref.finalize(root, _KEY_INDEXES.pop, id(root), None)
+    _KEY_INDEXES[id(root)] = index = KeyIndex(root)
+    return index
+
+
+def create_index(node, key, kind="sorted"):
+    """Index the values of the nodes with this key in the root document of node"""
+
+    index = get_index(node) or build_index(node)
+    return index.add_value_index(key, kind)
+
+
+def drop_index(node):
+    """Remove the key index of the root document of node, if any"""
+
+    _KEY_INDEXES.pop(id(_root_of(node)), None)
+
+
+def get_index(node):
+    """Return the key index of the root document of node, or None"""
+
+    if not _KEY_INDEXES:
+        return None
+    return _KEY_INDEXES.get(id(_root_of(node)))
+
+
+def _child_position(node, dict_positions):
+    """Position of node within its parent, or None if the parent doesn't hold it anymore"""
+
+    parent = node.parent
+    if isinstance(parent, dict):
+        keys = dict_positions.get(id(parent))
+        if keys is None:
+            keys = dict_positions[id(parent)] = {k: i for i, k in enumerate(dict.keys(parent))}
+        position = keys.get(node._key)
+        if position is None or dict.get(parent, node._key) is not node:
+            return None
+        return position
+    position = node._index
+    if (
+        isinstance(position, int)
+        and 0 <= position < len(parent)
+        and list.__getitem__(parent, position) is node
+    ):
+        return position
+    for position, item in enumerate(list.__iter__(parent)):
+        if item is node:
+            return position
+    return None
+
+
+def _in_document_order(node, nodes, recursive=True):
+    """
+    Filter the nodes which are descendants of node (or children, if recursive is False)
+    and sort them in document order, like _iter_nodes(node) would return them.
+    Positions are computed upwards from each node and shared between siblings,
+    so the cost depends on the number of nodes to sort, not on the size of the document.
+    """
+
+    positions = {id(node): ()}  # id of node -> tuple of positions from the queried node
+    dict_positions = {}
+    ordered = []
+    for candidate in nodes:
+        if not recursive and candidate.parent is not node:
+            continue
+        chain = []
+        current = candidate
+        while current is not None and id(current) not in positions:
+            chain.append(current)
+            current = current.parent
+        if current is None:  # it is not a descendant of node
+            continue
+        path = positions[id(current)]
+        for item in reversed(chain):
+            position = _child_position(item, dict_positions)
+            if position is None:  # removed from the document
+                break
+            path = positions[id(item)] = path + (position,)
+        else:
+            ordered.append((path, candidate))
+    ordered.sort(key=lambda pair: pair[0])
+    return [candidate for _, candidate in ordered]
@@ -10,6 +10,7 @@ from jsonutils.encoders import JSONObjectEncoder
 import jsonutils.functions.parsers as parsers
 from jsonutils.exceptions import JSONQueryException
 from jsonutils.functions.decorators import atomic_transaction, return_native_types
+from jsonutils.functions.writer import _write_json, _write_ndjson
 from jsonutils.utils.dict import ValuesDict
 
 
@@ -55,7 +56,7 @@ class SingleQuery:
         self._parse_key(query_key)
 
     def _parse_key(self, query_key):
-        """Convert query full key in a list of actions"""
+        """Convert query full key in a list of actions, and compile them"""
 
         splitted_query = [i for i in query_key.split("__") if i]
 
@@ -64,6 +65,7 @@ class SingleQuery:
 
         self.target_key = splitted_query[0]
         self.target_actions = splitted_query[1:] or ["exact"]
+        self._steps = parsers._compile_actions(tuple(self.target_actions))
 
     def _check_against_node(self, node):
         """
@@ -77,51 +79,7 @@ class SingleQuery:
         if node._key != self.target_key:
             return False
 
-        # grab a list of node actions, without the action suffix
-        node_actions = [
-            i.replace("_action", "") for i in dir(base.JSONNode) if i.endswith("action")
-        ]
-        obj = node
-
-        actions_count = len(self.target_actions)
-        for idx, action in enumerate(self.target_actions):
-
-            # ---- MODIFICATORS ----
-            if action == "parent":
-                obj = obj.parent
-                if obj is None:
-                    return False
-                if idx == actions_count - 1:
-                    action = "exact"  # if parent is last action, take exact as the default one
-                else:
-                    continue  # continue to next action
-            elif match := re.fullmatch(r"c_(\w+)", action):  # child modificator
-                try:
-                    obj = obj.__getitem__(match.group(1))
-                except Exception:
-                    return False
-                if idx == actions_count - 1:
-                    action = "exact"  # if child is last action, take exact as the default one
-                else:
-                    continue  # continue to next action
-            elif action.isdigit():
-                if not isinstance(obj, list):
-                    return False
-                try:
-                    obj = obj[int(action)]
-                except IndexError:
-                    return False
-                if idx == actions_count - 1:
-                    action = "exact"  # if digit is last action, take exact as the default one
-                else:
-                    continue  # continue to next action
-
-            # ---- ACTIONS ----
-            # node actions can't interfer with modificators
-            if action in node_actions:  # call corresponding node method
-                return getattr(obj, action + "_action")(self.target_value)
-            else:
-                raise JSONQueryException(f"Bad query: {action}")
+        return parsers._run_steps(node, self._steps, self.target_value)
 
 
 class Q:
@@ -406,6 +364,9 @@ class QuerySet(list):
 
     def filter(self, **q):
 
+        # only existence is checked, so querying can stop at the first match
+        q.setdefault("stop_at_match_", 1)
+
         cls = self.__class__
 
         output = cls()
@@ -429,6 +390,9 @@ class QuerySet(list):
     def filter_key(self, pattern, **q):
         # TODO add test
 
+        # only existence is checked, so querying can stop at the first match
+        q.setdefault("stop_at_match_", 1)
+
         cls = self.__class__
 
         output = cls()
@@ -543,7 +507,7 @@ class QuerySet(list):
 
         result = 0
         for item in self:
-            number = parsers.parse_float(item, fail_silently=True) or 0
+            number = base._to_float(item, fail_silently=True) or 0
             result += number
         return result
 
@@ -560,7 +524,7 @@ class QuerySet(list):
         length = 0
         for item in self:
             try:
-                number = parsers.parse_float(item)
+                number = base._to_float(item)
             except Exception:
                 continue
             else:
@@ -581,6 +545,58 @@ class QuerySet(list):
             output.append((item._data, super().count(item)))
         return output
 
+    def save(
+        self,
+        path,
+        create_path=True,
+        ensure_ascii=False,
+        indent=4,
+        ndjson=False,
+        append=False,
+        chunk_size=1000,
+        compression="infer",
+        **kwargs,
+    ):
+        """
+        Save the queryset items to a file, as a json array or as a newline-delimited json file.
+        Arguments
+        ---------
+            path: full path where to store the output file
+            create_path: if True, then path to file will be created if doesn't exist
+            ensure_ascii: if you want to handle unicode values
+            indent: number of indents (default 4). Ignored for NDJSON files
+            ndjson: if True, write one line per item, encoding and writing them in chunks
+            append: if True, append the items to an existing NDJSON file instead of overwriting it
+            chunk_size: number of NDJSON records encoded and written at a time
+            compression: "gzip", "bz2", "xz", "zstd" or None. By default, it is inferred from the
+                path extension (.gz, .bz2, .xz or .zst). The output is compressed as a stream
+        Returns the number of saved items.
+        """
+
+        if not ndjson:
+            if append:
+                raise ValueError("Only NDJSON files can be appended to")
+            _write_json(
+                self,
+                path,
+                create_path=create_path,
+                ensure_ascii=ensure_ascii,
+                indent=indent,
+                compression=compression,
+                **kwargs,
+            )
+            return self.__len__()
+        return _write_ndjson(
+            self,
+            path,
+            append=append,
+            create_path=create_path,
+            ensure_ascii=ensure_ascii,
+            chunk_size=chunk_size,
+            compression=compression,
+            **kwargs,
+        )
+
     def __str__(self):
         return json.dumps(self, cls=JSONObjectEncoder, indent=4, ensure_ascii=False)
 
@@ -4,6 +4,7 @@ import jsonutils as js
 from jsonutils.base import JSONBool, JSONDict, JSONInt, JSONList, JSONNull
 from jsonutils.exceptions import JSONQueryMultipleValues
 from jsonutils.functions.decorators import global_config
+from jsonutils.functions.external import Orjson
 
 
 class JsonTest(unittest.TestCase):
@@ -72,3 +73,69 @@ class JsonTest(unittest.TestCase):
         self.assertNotIsInstance(
             native_true_exceptions_false_include_parents_true(test), JSONDict
         )
+
+    def _check_json_backend(self, backend):
+        import json
+        import tempfile
+        from pathlib import Path
+
+        from jsonutils.functions.backends import json_dumps
+
+        data = {"A": [1, 2.5, True, None], "B": "ñ", "C": {"D": 2 ** 70}, "E": [{}, []]}
+        try:
+            js.config.JSON_BACKEND = backend
+            string = json.dumps(data)
+            for document in (string, string.encode(), memoryview(string.encode())):
+                self.assertDictEqual(js.JSONObject.loads(document)._data, data)
+            self.assertEqual(js.JSONObject.loads("[NaN]")._0, None)
+
+            test = js.JSONObject(data)
+            self.assertEqual(json.loads(test.json_encode()), data)
+            # the output format is the one of json, and non finite floats are kept
+            self.assertEqual(test.json_encode(), json.dumps(data))
+            self.assertEqual(js.JSONObject({"a": 1}).json_encode(), '{"a": 1}')
+            self.assertEqual(
+                js.JSONObject({"a": 1}).json_encode(separators=(",", ":")), '{"a":1}'
+            )
+            floats = {"A": [1.5, float("nan"), float("inf")], "B": {"C": float("-inf")}}
+            self.assertEqual(json_dumps(floats), json.dumps(floats))
+            floats = {"A": [1.5, float("inf")], "B": {"C": float("-inf")}}
+            self.assertEqual(js.JSONObject(floats).json_encode(), json.dumps(floats))
+            with tempfile.TemporaryDirectory() as tmp:
+                path = Path(tmp) / "floats.json"
+                js.JSONObject(floats).save(path, indent=2)
+                self.assertEqual(path.read_text(), json.dumps(floats, indent=2))
+            self.assertEqual(test.B.json_encode(), json.dumps("ñ"))
+            nested = {"A": [1, {"B": "ñ", "C": []}], "D": {}}
+            for indent in (4, 0, "\t"):
+                self.assertEqual(
+                    js.JSONObject(nested).json_encode(indent=indent),
+                    json.dumps(nested, indent=indent),
+                )
+            with tempfile.TemporaryDirectory() as tmp:
+                path = Path(tmp) / "test.json"
+                test.save(path, indent=2)
+                self.assertDictEqual(js.JSONObject.open(path)._data, data)
+                js.JSONObject(nested).save(path)
+                self.assertEqual(path.read_text(), json.dumps(nested, indent=4, ensure_ascii=False))
+        finally:
+            js.config.JSON_BACKEND = "auto"
+
+    def test_json_backend(self):
+        for backend in ("json", "auto"):
+            self._check_json_backend(backend)
+        try:
+            js.config.JSON_BACKEND = "other"
+            self.assertRaises(ValueError, js.JSONObject({}).json_encode)
+        finally:
+            js.config.JSON_BACKEND = "auto"
+
+    @unittest.skipUnless(Orjson() is not None, "orjson is not installed")
+    def test_orjson_backend(self):
+        from jsonutils.functions.backends import _orjson_option
+
+        self._check_json_backend("orjson")
+        # indented output is encoded by orjson, whatever the indent
+        for indent in (2, 4, "\t"):
+            self.assertIsNotNone(_orjson_option(indent))
+        self.assertIsNone(_orjson_option(None))
@@ -32,3 +32,32 @@ class CopyTest(unittest.TestCase):
         query = self.test1.query(A=All)
         query_copy = query.copy()
         self.assertListEqual(query._data, query_copy._data)
+
+    def test_copy_on_write(self):
+        test = self.test1
+        test_copy = test.A._0.copy()
+
+        self.assertEqual(test_copy.jsonpath, test.A._0.jsonpath)
+        self.assertIsNot(test_copy.root, test)
+
+        # modifying the copy must not modify the original object, and vice versa
+        test_copy.A.B.append(3)
+        test_copy.B = "bb"
+        self.assertListEqual(test.A._0.A.B._data, [1, 2])
+        self.assertEqual(test.A._0.B, "aa")
+        self.assertDictEqual(test_copy.root._data["A"][0], {"A": {"B": [1, 2, 3]}, "B": "bb"})
+
+        test.A._1.B = "other"
+        self.assertEqual(test_copy.root.A._1.B, "name")
+        self.assertEqual(test.copy().A._1.B, "other")
+        self.assertEqual(test.copy().query(B="other").count(), 1)
+
+        # native data of the copy is not shared with the original
+        test = JSONObject({"X": {"A": {"B": [1]}}})
+        test_copy = test.X.copy()
+        test_copy._data["A"]["B"].append(9)
+        test_copy.A.B.append(2)
+        self.assertDictEqual(test._data, {"X": {"A": {"B": [1]}}})
+        self.assertDictEqual(test_copy.root._data, {"X": {"A": {"B": [1, 2]}}})
+        test.X.A.B.append(3)
+        self.assertDictEqual(test_copy.root._data, {"X": {"A": {"B": [1, 2]}}})
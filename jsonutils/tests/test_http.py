@@ -0,0 +1,156 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jsonutils as js
+from jsonutils.utils import http
+from jsonutils.utils.retry import _backoff, retry_function
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Answers 503 to the first request of every path ending with /flaky, 404 to /missing,
+    and 304 to requests with a matching If-None-Match header
+    """
+
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        if self.path == "/slow":
+            time.sleep(0.2)
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+        elif self.path.endswith("/flaky") and self.requests.count(self.path) == 1:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+        else:
+            body = b'{"A": [1, 2]}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("localhost", 0), _Handler)
+        cls.url = f"http://localhost:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _Handler.requests.clear()
+
+    def test_retries(self):
+        test = js.JSONObject.open(f"{self.url}/flaky")
+        self.assertListEqual(test.A._data, [1, 2])
+        self.assertListEqual(_Handler.requests, ["/flaky", "/flaky"])
+
+        # client errors are not repeated
+        self.assertRaisesRegex(
+            Exception,
+            r"after 1 tries \(status code 404\)",
+            retry_function,
+            http.get,
+            f"{self.url}/missing",
+        )
+        response = retry_function(http.get, f"{self.url}/missing", raise_exception=False)
+        self.assertEqual(response.status_code, 404)
+        self.assertListEqual(_Handler.requests, ["/flaky", "/flaky", "/missing", "/missing"])
+
+    def test_backoff(self):
+        for attempt in range(10):
+            self.assertLessEqual(_backoff(attempt), js.config.HTTP_BACKOFF_MAX)
+
+    def test_shared_session(self):
+        self.assertIs(http.get_session(), http.get_session())
+
+    def test_rate_limit(self):
+        try:
+            js.config.HTTP_RATE_LIMIT = 20
+            js.config.HTTP_RATE_BURST = 2
+            start = time.perf_counter()
+            for _ in range(6):
+                http.get(f"{self.url}/ok")
+            # the first 2 requests are a burst, the other 4 wait 1/20 s each
+            self.assertGreaterEqual(time.perf_counter() - start, 0.19)
+        finally:
+            js.config.HTTP_RATE_LIMIT = None
+            js.config.HTTP_RATE_BURST = 1
+
+    def test_cache(self):
+        try:
+            js.config.HTTP_CACHE = True
+            js.config.HTTP_CACHE_DIR = None
+            http.clear_cache()
+            for _ in range(3):
+                self.assertListEqual(js.JSONObject.open(f"{self.url}/cached").A._data, [1, 2])
+            self.assertListEqual(_Handler.requests, ["/cached"])
+
+            # expired responses are revalidated
+            js.config.HTTP_CACHE_TTL = 0
+            self.assertListEqual(js.JSONObject.open(f"{self.url}/cached").A._data, [1, 2])
+            self.assertListEqual(_Handler.requests, ["/cached", "/cached"])
+            js.config.HTTP_CACHE_TTL = 300
+
+            # concurrent requests of the same url are fetched once
+            with ThreadPoolExecutor(4) as executor:
+                responses = list(executor.map(http.get, [f"{self.url}/slow"] * 4))
+            self.assertTrue(all(i.json() == {"A": [1, 2]} for i in responses))
+            self.assertEqual(_Handler.requests.count("/slow"), 1)
+
+            # requests with credentials are not served from the cache
+            http.get(f"{self.url}/private", auth=("alice", "x"))
+            http.get(f"{self.url}/private", auth=("bob", "y"))
+            http.get(f"{self.url}/private")
+            http.get(f"{self.url}/private")
+            self.assertEqual(_Handler.requests.count("/private"), 3)
+            session = http.get_session()
+            session.auth = ("alice", "x")
+            try:
+                http.get(f"{self.url}/private")
+            finally:
+                session.auth = None
+            self.assertEqual(_Handler.requests.count("/private"), 4)
+
+            # aopen requests are cached and coalesced too
+            async def load_twice():
+                return await asyncio.gather(
+                    js.JSONObject.aopen([f"{self.url}/async", f"{self.url}/async"]),
+                    js.JSONObject.aopen([f"{self.url}/async"]),
+                )
+
+            first, second = asyncio.run(load_twice())
+            self.assertTrue(all(i.A._data == [1, 2] for i in first + second))
+            self.assertEqual(_Handler.requests.count("/async"), 1)
+
+            with tempfile.TemporaryDirectory() as tmp:
+                js.config.HTTP_CACHE_DIR = tmp
+                http.get(f"{self.url}/stored")
+                js.config.HTTP_CACHE_SIZE = 1  # a new cache, which only has the stored responses
+                self.assertEqual(http.get(f"{self.url}/stored").json(), {"A": [1, 2]})
+                self.assertEqual(_Handler.requests.count("/stored"), 1)
+        finally:
+            js.config.HTTP_CACHE = False
+            js.config.HTTP_CACHE_DIR = None
+            js.config.HTTP_CACHE_SIZE = 128
+            js.config.HTTP_CACHE_TTL = 300
@@ -19,12 +19,13 @@ from jsonutils.base import (
     JSONNull,
     JSONObject,
     JSONPath,
+    JSONResults,
     JSONSingleton,
     JSONStr,
     JSONUnknown,
 )
 from jsonutils.encoders import JSONObjectEncoder
-from jsonutils.exceptions import JSONQueryException, JSONQueryMultipleValues
+from jsonutils.exceptions import JSONDecodeException, JSONQueryException, JSONQueryMultipleValues
 from jsonutils.functions.seekers import empty
 from jsonutils.query import All, ExtractYear, QuerySet, SingleQuery, ValuesList
 
@@ -354,6 +355,301 @@ class JsonTest(unittest.TestCase):
         data = results.query(name=All)
         pass
 
+    def test_lazy_open(self):
+
+        path = "./jsonutils/tests/balance-sheet-example-test.json"
+        lazy_test = JSONObject.open(path, lazy=True)
+        test = JSONObject.open(path)
+
+        self.assertIsInstance(lazy_test, JSONDict)
+        self.assertEqual(lazy_test.query(name=All).jsonpaths(), test.query(name=All).jsonpaths())
+        self.assertDictEqual(lazy_test._data, test._data)
+
+    def test_lazy_children(self):
+
+        data = {"A": [{"B": 1, "C": "2"}, {"B": 2, "D": [1, [2, 3]]}], "E": {"F": None}}
+        test = JSONObject(data, lazy=True)
+
+        # children are only parsed after being accessed
+        self.assertNotIsInstance(dict.__getitem__(test, "E"), JSONDict)
+        self.assertEqual(test.A._1.D._1._0.jsonpath.keys, ("A", 1, "D", 1, 0))
+        self.assertIsInstance(dict.__getitem__(test, "A"), JSONList)
+        self.assertNotIsInstance(dict.__getitem__(test, "E"), JSONDict)
+        list(test.items())
+        self.assertIsInstance(dict.__getitem__(test, "E"), JSONDict)
+        self.assertEqual(test.A._0.parent.parent, test)
+
+        self.assertListEqual(JSONObject(data, lazy=True).query(B__gte=2).jsonpaths(), ["A/1/B"])
+        self.assertEqual(JSONObject(data, lazy=True).get(C=2).jsonpath.keys, ("A", 0, "C"))
+        self.assertEqual(JSONObject(data, lazy=True), JSONObject(data))
+        self.assertDictEqual(JSONObject(data, lazy=True)._data, data)
+        self.assertEqual(JSONObject.loads(json.dumps(data), lazy=True).eval_path("A/0/B"), 1)
+
+        test = JSONObject(data, lazy=True)
+        test["E"] = 5
+        self.assertEqual(test.query(E=All).count(), 1)
+        self.assertEqual(test.E.jsonpath.keys, ("E",))
+
+    def test_iterparse(self):
+        import io
+        import tempfile
+
+        data = {
+            "meta": {"count": 3},
+            "data": [{"A": 1, "B": [1, 2]}, {"A": 22, "B": []}, {"A": 333, "C": "x\"y"}],
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "test.json"
+            path.write_text(json.dumps(data))
+
+            records = list(JSONObject.iterparse(path, path="data/*", chunk_size=7))
+            self.assertListEqual([i._data for i in records], data["data"])
+            self.assertIsInstance(records[0], JSONDict)
+            self.assertEqual(records[1].jsonpath.keys, ("data", 1))
+            self.assertEqual(records[0].B._1.jsonpath.keys, ("data", 0, "B", 1))
+            self.assertListEqual(records[2].query(C=All).jsonpaths(), ["data/2/C"])
+
+            # records are roots, so they can be copied and mutated
+            copy = records[0].copy()
+            self.assertEqual(copy._data, data["data"][0])
+            self.assertIsNot(copy, records[0])
+            self.assertEqual(copy.jsonpath.keys, ())
+            records[0].B.update(5)
+            records[1].query(A=All).update(0)
+            self.assertEqual(records[0]._data, {"A": 1, "B": 5})
+            self.assertEqual(records[1].A, 0)
+            self.assertEqual(records[0].B.jsonpath.keys, ("data", 0, "B"))
+            self.assertEqual(records[0].B.copy().parent._data, {"A": 1, "B": 5})
+
+        self.assertListEqual(
+            [i._data for i in JSONObject.iterparse(io.StringIO(json.dumps(data)), "data/*/A")],
+            [1, 22, 333],
+        )
+        self.assertListEqual(
+            [i.jsonpath.keys for i in JSONObject.iterparse(io.StringIO("[[1], [2, 3]]"))],
+            [(0,), (1,)],
+        )
+        # multibyte characters split between chunks of a binary stream
+        stream = io.BytesIO(json.dumps({"data": ["ñañ", "€ü"]}, ensure_ascii=False).encode())
+        self.assertListEqual(
+            [i._data for i in JSONObject.iterparse(stream, "data/*", chunk_size=3)], ["ñañ", "€ü"]
+        )
+
+    def test_ndjson(self):
+        import io
+        import tempfile
+
+        records = [{"A": 1, "B": [1, 2]}, {"A": 22, "B": "ñ"}, {"C": [3]}, None]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "out" / "test.ndjson"
+
+            JSONObject(records[:2]).save(path, ndjson=True, chunk_size=1)
+            JSONObject(records[2]).save(path, ndjson=True, append=True)
+            self.assertEqual(JSONObject({"A": 1}).query(A=1).save(path, ndjson=True, append=True), 1)
+            lines = path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 4)
+            self.assertListEqual([json.loads(i) for i in lines], records[:3] + [1])
+
+            read = list(JSONObject.read_ndjson(path))
+            self.assertListEqual([i._data for i in read], records[:3] + [1])
+            self.assertEqual(read[1].B.jsonpath.keys, (1, "B"))
+
+            obj = JSONObject.open(path, ndjson=True)
+            self.assertIsInstance(obj, JSONList)
+            self.assertListEqual(obj._data, records[:3] + [1])
+            self.assertRaises(ValueError, JSONObject(records).save, path, append=True)
+
+        stream = io.StringIO("\n".join(json.dumps(i) for i in records) + "\n\n")
+        self.assertListEqual([i._data for i in JSONObject.read_ndjson(stream, lazy=True)], records)
+        self.assertRaises(JSONDecodeException, list, JSONObject.read_ndjson(io.StringIO('{"A": 1}\n{')))
+
+    def test_aopen(self):
+        import asyncio
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(5):
+                paths.append(Path(tmp) / f"{i}.json")
+                paths[-1].write_text(json.dumps({"A": i, "B": list(range(i))}))
+
+            async def load():
+                results = await JSONObject.aopen(paths, concurrency=2, parse_threshold=10)
+                single = await JSONObject.aopen(paths[1], lazy=True)
+                loaded = [obj async for obj in JSONObject.aopen(paths, concurrency=3)]
+                return results, single, loaded
+
+            results, single, loaded = asyncio.run(load())
+            self.assertIsInstance(results, JSONResults)
+            self.assertListEqual([i.A for i in results], list(range(5)))
+            self.assertListEqual([i._storage_path for i in results], [str(i) for i in paths])
+            self.assertDictEqual(single._data, {"A": 1, "B": [0]})
+            self.assertListEqual(sorted(i.A for i in loaded), list(range(5)))
+
+            paths[0].write_text("{")
+            self.assertRaises(JSONDecodeException, asyncio.run, load())
+
+            # scalar documents, which have no storage path
+            paths[0].write_text('"abc"')
+            paths[1].write_text("1.5")
+            self.assertListEqual(JSONObject.open([str(i) for i in paths[:3]])[:2], ["abc", 1.5])
+
+            async def load_scalars():
+                return await JSONObject.aopen(paths[:2])
+
+            self.assertListEqual(asyncio.run(load_scalars()), ["abc", 1.5])
+
+    def test_results_workers(self):
+        results = JSONResults(
+            JSONObject({"A": i, "B": [{"A": i + 1}, {"C": i}]}) for i in range(5)
+        )
+        with results.start_workers(2):
+            first = results.query(A__gte=3)
+            self.assertListEqual(
+                [i.jsonpaths() for i in first],
+                [[], [], ["B/0/A"], ["A", "B/0/A"], ["A", "B/0/A"]],
+            )
+            self.assertIs(first[4][1].parent, results[4].B._0)
+            self.assertIs(first[4]._root, results[4])
+
+            # modified documents are sent again to the workers
+            results[0].B._1.C = 10
+            self.assertListEqual(
+                [i.jsonpaths() for i in results.query(C__gt=3)], [["B/1/C"], [], [], [], ["B/1/C"]]
+            )
+            self.assertListEqual(
+                [len(i) for i in results.query(A=1, include_parent_=True)], [1, 1, 0, 0, 0]
+            )
+            self.assertRaises(JSONQueryException, results.query, A__fake=1)
+
+        self.assertIsNone(results._workers)
+        self.assertListEqual(
+            [i.jsonpaths() for i in results.query(C__gt=3)], [["B/1/C"], [], [], [], ["B/1/C"]]
+        )
+
+        # removed and replaced documents are unloaded from the workers
+        with results.start_workers(2):
+            results.pop()
+            results.pop(0)
+            self.assertListEqual([len(i) for i in results.query(A__gte=2)], [1, 2, 2])
+            results[0] = JSONObject({"A": 7})
+            self.assertListEqual([len(i) for i in results.query(A=7)], [1, 0, 0])
+
+        # documents with non str keys
+        results = JSONResults([JSONObject({1: {"A": 1}, "B": [{2: {"A": 1}}]})])
+        with results.start_workers(1):
+            matches = results.query(A=1)[0]
+            self.assertListEqual([i.jsonpath.keys for i in matches], [(1, "A"), ("B", 0, 2, "A")])
+            self.assertIs(matches[0].parent, results[0][1])
+
+    def test_compression(self):
+        import gzip
+        import tempfile
+
+        from jsonutils.functions.external import Zstandard
+
+        data = {"A": [1, 2, {"B": "ñ"}], "C": None}
+        extensions = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+        if Zstandard() is not None:
+            extensions["zstd"] = ".zst"
+        with tempfile.TemporaryDirectory() as tmp:
+            for compression, extension in extensions.items():
+                path = Path(tmp) / f"test.json{extension}"
+                JSONObject(data).save(path)
+                self.assertEqual(JSONObject.open(path)._data, data)
+                self.assertListEqual(
+                    [i._data for i in JSONObject.iterparse(path, "A/*")], data["A"]
+                )
+
+                # compression is detected from the magic bytes of the file
+                path = Path(tmp) / "test.json"
+                JSONObject(data).save(path, compression=compression)
+                self.assertNotEqual(path.read_bytes()[:1], b"{")
+                self.assertEqual(JSONObject.open(path)._data, data)
+
+                path = Path(tmp) / f"test.ndjson{extension}"
+                JSONObject(data["A"]).save(path, ndjson=True)
+                JSONObject(data).save(path, ndjson=True, append=True)
+                self.assertListEqual(
+                    [i._data for i in JSONObject.read_ndjson(path)], data["A"] + [data]
+                )
+
+            self.assertEqual(gzip.decompress((Path(tmp) / "test.json.gz").read_bytes())[:1], b"{")
+            self.assertRaises(ValueError, JSONObject(data).save, path, compression="fake")
+
+    def test_streaming_save(self):
+        import os
+        import tempfile
+
+        from jsonutils.functions.writer import _iter_json_chunks
+
+        data = {
+            "A": [1, 2.5, float("inf"), True, None, "ñ\"x"],
+            "B": {"b": [], "a": {}, "c": [[1, {"d": [{}]}], list(range(12000))]},
+            "C": [{"D": i, "E": [i, str(i)]} for i in range(1500)],
+        }
+        options = (
+            dict(indent=4),
+            dict(indent=2, sort_keys=True),
+            dict(indent=None),
+            dict(indent=None, separators=(",", ":"), ensure_ascii=True),
+            dict(indent="\t", ensure_ascii=False),
+        )
+        try:
+            js.config.JSON_BACKEND = "json"
+            for kwargs in options:
+                kwargs.setdefault("ensure_ascii", False)
+                self.assertEqual(
+                    "".join(_iter_json_chunks(data, **kwargs)), json.dumps(data, **kwargs)
+                )
+            self.assertEqual("".join(_iter_json_chunks(5)), "5")
+
+            # nodes are walked without caching their native data, in parts of bounded size
+            test = JSONObject(data)
+            self.assertEqual(
+                "".join(_iter_json_chunks(test, indent=4)),
+                json.dumps(data, indent=4, ensure_ascii=False),
+            )
+            self.assertNotIn("_data_cache", test.__dict__)
+            self.assertNotIn("_data_cache", test.C[0].__dict__)
+            chunks = list(_iter_json_chunks(JSONObject({"A": [["x" * 1000] * 100] * 100})))
+            self.assertGreater(len(chunks), 10)
+            self.assertLess(max(len(i) for i in chunks), 2 * 2 ** 16)
+        finally:
+            js.config.JSON_BACKEND = "auto"
+        self.assertGreater(len(list(_iter_json_chunks(data, indent=4))), 1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "test.json"
+            test = JSONObject(data)
+            test.save(path)
+            self.assertEqual(json.loads(path.read_text()), json.loads(json.dumps(data)))
+            test.save(path, compact=True)
+            self.assertNotIn(" ", path.read_text().replace("ñ", ""))
+            self.assertEqual(JSONObject.open(path)._data, test._data)
+
+            # a failed save leaves the previous file untouched
+            self.assertRaises(TypeError, test.save, path, fake_option=True)
+            self.assertEqual(JSONObject.open(path)._data, test._data)
+            self.assertListEqual(os.listdir(tmp), ["test.json"])
+
+            # links are written through, and the file mode is kept
+            if os.name == "posix":
+                os.chmod(path, 0o600)
+                link = Path(tmp) / "link.json"
+                link.symlink_to(path)
+                JSONObject({"A": 1}).save(link)
+                self.assertTrue(link.is_symlink())
+                self.assertEqual(JSONObject.open(path)._data, {"A": 1})
+                self.assertEqual(path.stat().st_mode & 0o777, 0o600)
+                link.unlink()
+
+            results = JSONResults(JSONObject({"A": i}) for i in range(4))
+            for i, obj in enumerate(results):
+                obj._storage_path = str(Path(tmp) / f"{i}.json")
+            results.save(max_workers=2, indent=None)
+            self.assertEqual((Path(tmp) / "3.json").read_text(), '{"A": 3}')
+
     def test_paths(self):
 
         self.assertEqual(
@@ -611,6 +907,21 @@ class JsonTest(unittest.TestCase):
             [{"value": 523689, "timestamp": "2021-05-01 09:00:00"}],
         )
 
+    def test_deep_queries(self):
+
+        test = JSONObject({})
+        node = test
+        for _ in range(3000):
+            node["A"] = {}
+            node = node["A"]
+        node["B"] = 1
+
+        self.assertEqual(test.query(B=1).count(), 1)
+        self.assertEqual(test.query_key("A").count(), 3000)
+        self.assertEqual(test.query_key("A", stop_at_match_=2).count(), 2)
+        self.assertEqual(test.query_key("A", recursive_=False).count(), 1)
+        self.assertEqual(test.to_path()[("A",) * 3000 + ("B",)], 1)
+
     def test_single_query_exact(self):
 
         test_dict = JSONObject({"A": {"A": 1, "B": True}})
@@ -783,7 +1094,7 @@ class JsonTest(unittest.TestCase):
             test2, JSONObject({"key": 111, "index": 222, "nested": {"index": 333}})
         )
         self.assertEqual(test2.query(key=All), [111])
-        self.assertListEqual(test2.query(index=All), [333, 222])
+        self.assertListEqual(test2.query(index=All), [222, 333])
         self.assertEqual(test2.query(index=333).first().jsonpath, "nested/index")
 
         self.assertTrue(test3.query(A__contains=4).exists())
@@ -853,6 +1164,15 @@ class JsonTest(unittest.TestCase):
         self.assertEqual(test.data._0.name, JSONNull(None))
         self.assertIsInstance(test.data._0.name, JSONNull)
 
+        # children removed by list methods must not appear in queries either
+        test = JSONObject({"data": [{"name": "Dan"}, {"name": "Ann"}]})
+        popped = test.data.pop()
+
+        self.assertEqual(test.query(name=All), ["Dan"])
+        self.assertEqual(len(test.data._child_objects), 1)
+        self.assertEqual(test.data._child_objects[test.data._0._id], {"name": "Dan"})
+        self.assertNotIn(popped._id, test.data._child_objects)
+
     def test_multiparent(self):
         test = JSONObject(
             {
@@ -1127,6 +1447,21 @@ class JsonTest(unittest.TestCase):
 
         self.assertRaises(TypeError, lambda: test.set_path(("A", "B", "A"), 30))
 
+    def test_cached_paths(self):
+        test = JSONObject({"A": {"B": {"C": 1}}, "D": [{"E": 2}]})
+        node = test.A.B
+
+        self.assertEqual(node.C.jsonpath.keys, ("A", "B", "C"))
+        self.assertEqual(test.D._0.E.jsonpath.keys, ("D", 0, "E"))
+
+        # paths must be updated when a node is moved or its key changes
+        test.D._0.B = test.A.pop("B")
+        self.assertEqual(node.C.jsonpath.keys, ("D", 0, "B", "C"))
+        test.rename_keys(D="F", inplace=True)
+        self.assertEqual(node.C.jsonpath.keys, ("F", 0, "B", "C"))
+        self.assertEqual(test.query(C__path="F").count(), 1)
+        self.assertEqual(test.query(C__nchild=4).count(), 1)
+
     def test_path_exists(self):
         test = JSONObject({"A": {"B": [{"C": {"D": 1}}]}})
 
@@ -1208,6 +1543,119 @@ class JsonTest(unittest.TestCase):
         self.assertEqual(js.join_paths("a", 2, "c", sep="/"), "a/2/c")
         self.assertEqual(js.join_paths(2.3), "2.3")
 
+    def test_native_types(self):
+        from collections import OrderedDict
+
+        class MyStr(str):
+            pass
+
+        test = JSONObject([float("nan"), (1, 2), OrderedDict(A=1), MyStr("a"), 1, True, None])
+        self.assertListEqual(
+            [type(child) for child in test],
+            [JSONNull, JSONList, JSONDict, JSONStr, JSONInt, JSONBool, JSONNull],
+        )
+        self.assertListEqual(test._data, [None, [1, 2], {"A": 1}, "a", 1, True, None])
+
+    def test_native_data_cache(self):
+        test = JSONObject({"A": [1, {"B": 2}], "C": {1: True, None: "x", 1.5: None}})
+
+        self.assertDictEqual(
+            test._data, {"A": [1, {"B": 2}], "C": {"1": True, "null": "x", "1.5": None}}
+        )
+        self.assertIs(test._native, test._native)
+        self.assertIs(test.A._native, test._native["A"])
+        self.assertDictEqual(test.json_decode, test._data)
+        self.assertIsNot(test.json_decode, test._data)
+
+        # mutations must be seen by cached ancestors
+        test.A._1.B = 3
+        self.assertEqual(test._data["A"][1]["B"], 3)
+        test.A.append(4)
+        self.assertListEqual(test._data["A"], [1, {"B": 3}, 4])
+        test.A.pop(0)
+        self.assertListEqual(test.eval_path("A", native_types_=True), [{"B": 3}, 4])
+        test.set_path(("A", 0, "B"), 5)
+        self.assertEqual(test.query(B=All, native_types_=True).first(), 5)
+        self.assertEqual(test._data["A"][0]["B"], 5)
+        test.C.pop(1)
+        self.assertDictEqual(test._data["C"], {"null": "x", "1.5": None})
+
+        # returned data is a new object, whose changes don't reach the cache
+        import tempfile
+
+        test = JSONObject({"X": {"A": {"B": [1]}}})
+        data = test.eval_path("X/A", native_types_=True)
+        data["B"].append(5)
+        data["Z"] = 1
+        test._data["X"]["A"]["B"].append(6)
+        test.query(A=All, native_types_=True).first()["B"].append(7)
+        test.X.values("A")["A"]["B"].append(8)
+        self.assertDictEqual(test._data, {"X": {"A": {"B": [1]}}})
+        self.assertEqual(len(test.X.A.B), 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "test.json"
+            test.save(path)
+            self.assertDictEqual(json.loads(path.read_text()), {"X": {"A": {"B": [1]}}})
+
+    def test_key_index(self):
+        test = JSONObject(
+            {"A": [{"name": 1, "B": {"name": 2}}, {"name": 3}], "C": {"name": 4, "D": 5}}
+        )
+        plain = (test.query(name__gt=0)._data, test.query_key("[A-D]")._data)
+        test.build_index()
+        self.assertListEqual(test.query(name__gt=0)._data, plain[0])
+        self.assertListEqual(test.query_key("[A-D]")._data, plain[1])
+        self.assertListEqual(test.A.query(name__gt=0)._data, [1, 2, 3])
+        self.assertListEqual(test.A._0.query(name__gt=0, recursive_=False)._data, [1])
+        self.assertEqual(test.C.get(name=All), 4)
+
+        # index is kept up to date by mutations
+        test.C.name = 6
+        test.A.append({"name": 7})
+        test.A[1] = {"name": 8}
+        test.annotate(name=9)
+        self.assertListEqual(test.query(name__gt=0)._data, [1, 2, 8, 7, 6, 9])
+        test.A._0.pop("name")
+        test.C.rename_keys({"D": "name"}, inplace=True)
+        self.assertListEqual(test.query(name__gt=0)._data, [2, 8, 7, 5, 9])
+        test.A.pop(0)
+        self.assertListEqual(test.query(name__gt=0)._data, test.copy().query(name__gt=0)._data)
+
+        test.drop_index()
+        self.assertListEqual(test.query(name__gt=0)._data, [8, 7, 5, 9])
+
+    def test_value_index(self):
+        test = JSONObject(
+            {
+                "A": [{"price": 5, "date": "2021-05-01"}, {"price": "7.5 $", "date": "2021-06-01"}],
+                "B": {"price": None, "C": [{"price": 12.0}, {"price": True}, {"price": "cheap"}]},
+            }
+        )
+        queries = (
+            dict(price__gt=6),
+            dict(price__lte="7.5"),
+            dict(price__exact=12),
+            dict(price__in=[5, None, "cheap"]),
+            dict(price="cheap"),
+            dict(date__gte="2021-05-15"),
+            dict(date__lt=datetime(2021, 5, 15)),
+            dict(price__isnull=True),
+        )
+        expected = [test.query(**q)._data for q in queries]
+        for kind in ("sorted", "hash"):
+            test.create_index("price", kind=kind).create_index("date", kind=kind)
+            self.assertListEqual([test.query(**q)._data for q in queries], expected)
+            test.drop_index()
+
+        test.create_index("price")
+        test.B.C.append({"price": 20})
+        test.A._0.price = 1
+        self.assertListEqual(test.query(price__gt=4)._data, ["7.5 $", 12.0, 20])
+        test.B.C.pop(0)
+        self.assertListEqual(test.query(price__gt=4)._data, ["7.5 $", 20])
+        with self.assertRaises(ValueError):
+            test.create_index("price", kind="tree")
+
     def test_pandas_none(self):
         test = JSONObject(dict(A=np.nan, B=pd.NA, C=pd.NaT, D=None, E=1))
         self.assertDictEqual(test._data, {"A": None, "B": None, "C": None, "D": None, "E": 1})
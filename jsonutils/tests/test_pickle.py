@@ -1,8 +1,8 @@
 import pickle
-from unittest import TestCase, skip
+from unittest import TestCase
 
 from jsonutils import JSONObject
-from jsonutils.base import JSONNull
+from jsonutils.base import JSONBool, JSONFloat, JSONNull, JSONStr
 
 
 class TestPickleObjects(TestCase):
@@ -11,10 +11,22 @@ class TestPickleObjects(TestCase):
             dict(null=None, float=1.2, int=1, obj=dict(A=1), arr=[1, 2], str="aa")
         )
 
-    @skip
     def test_json_null_pickable(self):
-        # TODO add __setstate__ and __getstate__ to nodes
         original_obj = JSONNull(None)
         pick = pickle.dumps(original_obj)
         obj = pickle.loads(pick)
         self.assertEqual(original_obj, obj)
+
+    def test_singletons_pickable(self):
+        for original_obj in (JSONBool(True), JSONStr("aa"), JSONFloat(1.2), self.test.int):
+            obj = pickle.loads(pickle.dumps(original_obj))
+            self.assertEqual(type(original_obj), type(obj))
+            self.assertEqual(original_obj, obj)
+            self.assertEqual(original_obj._key, obj._key)
+
+    def test_json_objects_pickable(self):
+        obj = pickle.loads(pickle.dumps(self.test))
+        self.assertDictEqual(obj._data, self.test._data)
+        self.assertEqual(obj.arr._1.jsonpath.keys, ("arr", 1))
+        self.assertIs(obj.obj.A.parent, obj.obj)
+        self.assertEqual(obj.query(A=1).count(), 1)
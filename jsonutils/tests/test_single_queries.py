@@ -43,3 +43,15 @@ class SingleQueryTest(unittest.TestCase):
                 "Comp/5/False",
             ],
         )
+
+    def test_repeated_query_keys(self):
+        test = JSONObject({"A": [{"B": 1}, {"B": True}, {"B": 1.5}, {"B": "1"}]})
+
+        # the same query keys must be evaluated against each new query value
+        self.assertListEqual(test.query(B__type=int).jsonpaths(), ["A/0/B"])
+        self.assertListEqual(test.query(B__type=bool).jsonpaths(), ["A/1/B"])
+        self.assertListEqual(test.query(B__type=float).jsonpaths(), ["A/2/B"])
+        self.assertListEqual(test.query(B__gte=1.5).jsonpaths(), ["A/2/B"])
+        self.assertListEqual(test.query(B__gte=1).jsonpaths(), ["A/0/B", "A/2/B", "A/3/B"])
+        self.assertListEqual(test.query(B__parent__parent__0__c_B=1).jsonpaths(), ["A/0/B", "A/1/B", "A/2/B", "A/3/B"])
+        self.assertEqual(test.query(B__gte=1, stop_at_match_=1).count(), 1)
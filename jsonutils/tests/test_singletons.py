@@ -2,7 +2,9 @@ import json
 import unittest
 from datetime import date, datetime, tzinfo
 
+import numpy as np
 import pytz
+import jsonutils.config as config
 from jsonutils.base import (
     JSONBool,
     JSONCompose,
@@ -19,8 +21,16 @@ from jsonutils.base import (
 from jsonutils.encoders import JSONObjectEncoder
 from jsonutils.exceptions import JSONSingletonException
 from jsonutils.functions.decorators import global_config
-from jsonutils.functions.parsers import parse_datetime, parse_float, parse_int
-from jsonutils.query import QuerySet
+from jsonutils.functions import parsers
+from jsonutils.functions.parsers import (
+    parse_bool_many,
+    parse_datetime,
+    parse_datetime_many,
+    parse_float,
+    parse_float_many,
+    parse_int,
+)
+from jsonutils.query import All, QuerySet
 
 
 class JsonTest(unittest.TestCase):
@@ -243,6 +253,13 @@ class JsonTest(unittest.TestCase):
         self.assertEqual(parse_float(" $3,150 euros."), 3150.0)
         self.assertEqual(parse_float("3,150.38", only_check=True), True)
         self.assertFalse(parse_float("fake", only_check=True))
+        self.assertEqual(parse_float("1.234,5 k", decimal_sep=",", thousands_sep="."), 1234500.0)
+        self.assertEqual(parse_float(" -inf"), float("-inf"))
+        self.assertRaisesRegex(
+            JSONSingletonException,
+            "Target string does not match a float number",
+            lambda: parse_float("price: 5"),
+        )
 
     def test_parse_int(self):
         self.assertEqual(parse_int("3,150"), 3150)
@@ -348,3 +365,107 @@ class JsonTest(unittest.TestCase):
             return data.fake_name
 
         self.assertIsNone(test_func(JSONObject({"A": 1})))
+
+    def test_parsed_values_cache(self):
+        test = JSONStr("1.234,5")
+        try:
+            config.DECIMAL_SEPARATOR, config.THOUSANDS_SEPARATOR = ",", "."
+            self.assertEqual(test.to_float(), 1234.5)
+            self.assertIsNone(test.to_datetime(fail_silently=True))
+            cache = test._cache
+            test.to_float()
+            self.assertIs(test._cache, cache)
+            # parsed values are discarded when settings change
+            config.DECIMAL_SEPARATOR, config.THOUSANDS_SEPARATOR = ".", ","
+            self.assertIsNone(test.to_datetime(fail_silently=True))
+            self.assertIsNot(test._cache, cache)
+        finally:
+            config.DECIMAL_SEPARATOR, config.THOUSANDS_SEPARATOR = ".", ","
+
+        # errors are raised on every call, as new exceptions
+        test = JSONStr("fake")
+        errors = []
+        for _ in range(2):
+            with self.assertRaises(JSONSingletonException) as context:
+                test.to_float()
+            errors.append(context.exception)
+        self.assertIsNot(errors[0], errors[1])
+        self.assertEqual(errors[0].args, errors[1].args)
+        self.assertTrue(JSONStr("https://www.google.com").is_url())
+        self.assertTrue(JSONStr("2021-05-01") > JSONStr("2021-04-01"))
+
+    def test_parse_iso_datetime(self):
+        self.assertEqual(
+            parse_datetime("2021-05-01T10:20:30.123456+02:00"),
+            datetime(2021, 5, 1, 10, 20, 30, tzinfo=pytz.FixedOffset(120)),
+        )
+        self.assertEqual(
+            parse_datetime("2021-05-01 10:20:30Z", tzone="Europe/Madrid"),
+            pytz.timezone("Europe/Madrid").localize(datetime(2021, 5, 1, 10, 20, 30)),
+        )
+        self.assertEqual(
+            parse_datetime("2021-05-01T10:20:30-05:00", only_date=True, tzone_aware=False),
+            datetime(2021, 5, 1),
+        )
+        # wrong ISO dates give the same error as other formats
+        self.assertRaisesRegex(
+            JSONSingletonException,
+            "Error on introduced datetime",
+            lambda: parse_datetime("2021-02-30"),
+        )
+        self.assertTrue(parse_datetime("2021-02-30", only_check=True))
+
+    def test_batch_parsers(self):
+        test = JSONObject({"A": ["1.5", " 2 ", "3 €", "1,000.5k", "no", None, 4, True]})
+        np.testing.assert_array_equal(
+            parse_float_many(test.A), [1.5, 2, 3, 1000500, np.nan, np.nan, 4, np.nan]
+        )
+        np.testing.assert_array_equal(parse_float_many(["1.5", "1e3"]), [1.5, 1000])
+        test = JSONObject({"A": [{"price": "1.5"}, {"price": "3 €"}, {"price": "-"}]})
+        np.testing.assert_array_equal(parse_float_many(test.query(price=All)), [1.5, 3, np.nan])
+
+        result = parse_datetime_many(
+            ["2021-05-01T10:20:30+02:00", "2021-05-01", "May 1, 2021", "2021-02-30", None]
+        )
+        self.assertEqual(result.dtype, np.dtype("datetime64[s]"))
+        np.testing.assert_array_equal(
+            result,
+            np.array(
+                ["2021-05-01T08:20:30", "2021-05-01", "2021-05-01", "NaT", "NaT"],
+                dtype="datetime64[s]",
+            ),
+        )
+        np.testing.assert_array_equal(
+            parse_datetime_many(["2021-05-01T10:20:30"], tzone="Europe/Madrid"),
+            np.array(["2021-05-01T08:20:30"], dtype="datetime64[s]"),
+        )
+
+        # wrong offsets are errors, even if they are ignored
+        for tzone_aware in (True, False):
+            np.testing.assert_array_equal(
+                parse_datetime_many(
+                    ["2021-05-01T10:00:00+24:00", "2021-05-01"], tzone_aware=tzone_aware
+                ),
+                np.array(["NaT", "2021-05-01"], dtype="datetime64[s]"),
+            )
+        # datetimes which numpy, but not datetime, can represent
+        np.testing.assert_array_equal(
+            parse_datetime_many(["0000-05-01", "9999-12-31T23:00:00-05:00"]),
+            np.array(["NaT", "10000-01-01T04:00:00"], dtype="datetime64[s]"),
+        )
+
+        result = parse_bool_many([" true", "False", "yes", False])
+        self.assertListEqual(result.tolist(), [True, False, None, False])
+
+        # without numpy, lists are returned
+        numpy = parsers.Numpy
+        try:
+            parsers.Numpy = lambda: None
+            self.assertListEqual(parse_float_many(["1.5", "no", 2]), [1.5, None, 2.0])
+            self.assertListEqual(
+                parse_datetime_many(["2021-05-01", "no"], tzone_aware=False),
+                [datetime(2021, 5, 1), None],
+            )
+            self.assertListEqual(parse_bool_many(["true", "no"]), [True, None])
+        finally:
+            parsers.Numpy = numpy
@@ -1,6 +1,6 @@
 import unittest
 
-from jsonutils.functions.parsers import parse_http_url, url_validator
+from jsonutils.functions.parsers import _may_be_url, parse_http_url, url_validator
 
 
 class JsonTest(unittest.TestCase):
@@ -23,6 +23,20 @@ class JsonTest(unittest.TestCase):
         self.assertFalse(url_validator("192.168.1.32"))
         self.assertFalse(url_validator("www.google.es"))
 
+    def test_cached_results(self):
+        self.assertIsNone(url_validator("no url at all", return_match=True, optative_protocol=True))
+        self.assertFalse(_may_be_url("google", optative_protocol=True))
+        self.assertFalse(_may_be_url("google.es", optative_protocol=False))
+        self.assertTrue(_may_be_url("localhost:80", optative_protocol=True))
+
+        match = url_validator("https://localhost:80/", return_match=True)
+        self.assertIs(url_validator("https://localhost:80/", return_match=True), match)
+        self.assertEqual(match.group("private_host"), "localhost")
+        self.assertTrue(url_validator("https://localhost:80/"))
+        self.assertFalse(url_validator("https://localhost:80/", public=True))
+        self.assertTrue(url_validator("http://google.com\n"))
+        self.assertRaises(TypeError, url_validator, 1)
+
     def test_parse_http_url(self):
 
         self.assertEqual(parse_http_url("www.example.com"), "http://www.example.com")
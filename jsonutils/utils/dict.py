@@ -1,20 +1,13 @@
-from collections.abc import KeysView
+from collections.abc import KeysView, Mapping
 
 import jsonutils.base as base
 
 
 class UUIDdict(dict):
     """
-    This objects represents a normal dict, but overwrites the way a new child item is set, asserting its UUID4 id is unique.
+    This objects represents a normal dict of child objects, indexed by their ids.
     """
 
-    def __setitem__(self, key, child):
-
-        while key in self.keys():
-            key = child._set_new_uuid()
-
-        return super().__setitem__(key, child)
-
     def values_except(self, except_):
 
         if isinstance(except_, str):
@@ -27,6 +20,45 @@ class UUIDdict(dict):
         return result.values()
 
 
+class ChildIndex(Mapping):
+    """
+    A read-only mapping of the child objects of a composed node, indexed by their ids.
+    Children are read directly from the node's dict or list, so nothing has to be registered
+    when a child is set or removed.
+    """
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    def values(self):
+        if isinstance(self._node, dict):
+            return dict.values(self._node)
+        return self._node
+
+    def values_except(self, except_):
+
+        if isinstance(except_, (str, int)):
+            return [v for v in self.values() if v._id != except_]
+        elif isinstance(except_, (list, tuple, set, KeysView)):
+            return [v for v in self.values() if v._id not in except_]
+        else:
+            raise TypeError("except_ argument must be a str, int o sequence instance")
+
+    def __getitem__(self, key):
+        for child in self.values():
+            if child._id == key:
+                return child
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (child._id for child in self.values())
+
+    def __len__(self):
+        return self._node.__len__()
+
+
 class TranslationDict(dict):
     """
     This objects represents a normal dict, but with a default value when trying to get a missing key.
@@ -0,0 +1,319 @@
+"""Pooled HTTP sessions, per-host rate limiting and response caching for http sources"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+
+import jsonutils.config as config
+
+_lock = threading.Lock()
+_sessions = {}  # process id -> session, since pooled connections can't be shared after a fork
+_buckets = {}  # host -> TokenBucket
+_cache = None  # ResponseCache for the current cache settings
+_pooled_sessions = weakref.WeakSet()  # sessions built by new_session, which may use the cache
+# request kwargs which can be served from the cache. Others, like auth or cookies, may shape the response
+_CACHE_KWARGS = ("params", "headers", "timeout")
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter. It allows `rate` acquisitions per second on average,
+    with bursts of up to `capacity` acquisitions. It is thread safe.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        if rate <= 0:
+            raise ValueError(f"Rate must be a positive number, not {rate}")
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until it is available. Returns the waited time"""
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # tokens can go negative, so concurrent callers queue up instead of racing
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+def new_session(pool_size: int) -> requests.Session:
+    """
+    Build a requests session keeping up to `pool_size` connections alive per host.
+    Its GET requests can be served from the response cache, like those of the shared session
+    """
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    _pooled_sessions.add(session)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the requests session shared by this process, whose connections are kept alive"""
+
+    pid = os.getpid()
+    session = _sessions.get(pid)
+    if session is None:
+        with _lock:
+            session = _sessions.get(pid)
+            if session is None:
+                session = new_session(config.HTTP_POOL_SIZE)
+                _sessions.clear()  # sessions inherited from a parent process
+                _sessions[pid] = session
+    return session
+
+
+def _wait_for_host(url: str) -> None:
+    """Apply the rate limit of config.HTTP_RATE_LIMIT to the host of url"""
+
+    rate = config.HTTP_RATE_LIMIT
+    if not rate:
+        return
+    host = urlsplit(url).netloc.lower()
+    with _lock:
+        bucket = _buckets.get(host)
+        if bucket is None or bucket.rate != rate or bucket.capacity != config.HTTP_RATE_BURST:
+            bucket = _buckets[host] = TokenBucket(rate, config.HTTP_RATE_BURST)
+    bucket.acquire()
+
+
+class _CachedResponse:
+    """A cached GET response, which is rebuilt as a new requests.Response each time it is used"""
+
+    __slots__ = ("url", "content", "headers", "encoding", "stored")
+
+    def __init__(self, url, content, headers, encoding, stored=None):
+        self.url = url
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding
+        self.stored = time.time() if stored is None else stored
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(response.url, response.content, dict(response.headers), response.encoding)
+
+    def is_fresh(self, ttl):
+        return time.time() - self.stored < ttl
+
+    def validators(self):
+        """Headers of a conditional request which asks whether this response has changed"""
+
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+    def response(self):
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = self.url
+        response.encoding = self.encoding
+        response.headers = requests.structures.CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        return response
+
+
+class ResponseCache:
+    """
+    Cache of GET responses: an in-memory LRU of `maxsize` entries, backed by files in `directory`
+    if it is not None. Entries older than `ttl` seconds have to be revalidated.
+    It is thread safe, and `lock` gives a per-key lock, so a response is fetched only once
+    when several threads request it at the same time.
+    """
+
+    def __init__(self, maxsize=128, ttl=300, directory=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.directory = Path(directory) if directory is not None else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def key(url, params=None, headers=None, cookies=None):
+        data = json.dumps([url, params, headers, cookies], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def lock(self, key):
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+        return lock
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._read(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def set(self, key, entry):
+        self._remember(key, entry)
+        self._write(key, entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.directory is not None and self.directory.is_dir():
+            for path in self.directory.glob("*.response"):
+                path.unlink()
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _read(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self.directory / f"{key}.response", "rb") as file:
+                meta = json.loads(file.readline())
+                content = file.read()
+        except (OSError, ValueError):
+            return None
+        return _CachedResponse(
+            meta["url"], content, meta["headers"], meta["encoding"], meta["stored"]
+        )
+
+    def _write(self, key, entry):
+        """Store the entry in a file: a json line of metadata followed by the raw content"""
+
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "url": entry.url,
+            "headers": entry.headers,
+            "encoding": entry.encoding,
+            "stored": entry.stored,
+        }
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(json.dumps(meta).encode("utf-8") + b"\n")
+                file.write(entry.content)
+            os.replace(temp_path, self.directory / f"{key}.response")
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def get_cache() -> ResponseCache:
+    """Return the response cache for the current settings of config.HTTP_CACHE_*"""
+
+    global _cache
+    settings = (config.HTTP_CACHE_SIZE, config.HTTP_CACHE_TTL, config.HTTP_CACHE_DIR)
+    with _lock:
+        if _cache is None or (_cache.maxsize, _cache.ttl, _cache.directory) != (
+            settings[0],
+            settings[1],
+            Path(settings[2]) if settings[2] is not None else None,
+        ):
+            _cache = ResponseCache(*settings)
+        return _cache
+
+
+def _is_cacheable(session: Optional[requests.Session], kwargs: dict) -> bool:
+    """
+    Whether a GET request can use the response cache: only requests sent by the shared session
+    (or another one built by new_session), which has no credentials or proxies,
+    whose kwargs don't shape the response
+    """
+
+    if not all(key in _CACHE_KWARGS for key in kwargs):
+        return False
+    if session is None:
+        session = get_session()
+    elif session not in _pooled_sessions:
+        return False
+    return session.auth is None and not session.proxies
+
+
+def _cached_get(
+    url: str, session: Optional[requests.Session] = None, **kwargs
+) -> requests.Response:
+    cache = get_cache()
+    session = session or get_session()
+    key = cache.key(
+        url, kwargs.get("params"), kwargs.get("headers"), session.cookies.get_dict() or None
+    )
+    with cache.lock(key):  # concurrent requests of the same response wait for the first one
+        entry = cache.get(key)
+        if entry is not None and entry.is_fresh(cache.ttl):
+            return entry.response()
+
+        if entry is not None:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **entry.validators()}
+        _wait_for_host(url)
+        response = session.request("GET", url, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            entry.stored = time.time()
+            cache.set(key, entry)
+            return entry.response()
+        if response.status_code == 200 and "no-store" not in response.headers.get(
+            "Cache-Control", ""
+        ):
+            cache.set(key, _CachedResponse.from_response(response))
+        return response
+
+
+def request(
+    method: str, url: str, session: Optional[requests.Session] = None, **kwargs
+) -> requests.Response:
+    """
+    Send a request through the shared session (or the selected one), applying the host rate limit.
+    If config.HTTP_CACHE is True, GET requests are served from the response cache when possible
+    (not if they are sent with credentials, cookies, proxies or a session not built by new_session).
+    """
+
+    if config.HTTP_CACHE and method.upper() == "GET" and _is_cacheable(session, kwargs):
+        return _cached_get(url, session, **kwargs)
+    _wait_for_host(url)
+    return (session or get_session()).request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def clear_cache() -> None:
+    """Remove every response of the cache, in memory and on disk"""
+
+    get_cache().clear()
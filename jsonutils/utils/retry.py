@@ -1,35 +1,117 @@
-import requests
+import logging
+import random
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+import jsonutils.config as config
+from jsonutils.utils import http
+
+logger = logging.getLogger(__name__)
+
+_HTTP_FUNCTIONS = (
+    requests.post,
+    requests.get,
+    requests.put,
+    requests.patch,
+    requests.delete,
+    http.request,
+    http.get,
+    http.post,
+)
+# client errors which may succeed if the request is repeated later
+_RETRY_STATUS_CODES = (408, 425, 429)
+# request errors which can't be fixed by repeating the request
+_FATAL_EXCEPTIONS = (
+    requests.exceptions.InvalidURL,
+    requests.exceptions.InvalidSchema,
+    requests.exceptions.MissingSchema,
+)
+
 
 class default:
     pass
 
 
+def _is_http_function(func):
+    return func in _HTTP_FUNCTIONS or isinstance(
+        getattr(func, "__self__", None), requests.Session
+    )
+
+
+def _retry_after(response):
+    """Seconds to wait as requested by the Retry-After header of a response, or None"""
+
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), config.HTTP_RETRY_AFTER_MAX)
+
+
+def _backoff(attempt, response=None):
+    """
+    Seconds to wait before the next attempt: the Retry-After header of the response if present,
+    else an exponential backoff with full jitter
+    """
+
+    retry_after = _retry_after(response)
+    if retry_after is not None:
+        return retry_after
+    delay = min(config.HTTP_BACKOFF_MAX, config.HTTP_BACKOFF_FACTOR * 2 ** attempt)
+    return random.uniform(0, delay)
+
+
 def retry_function(
     func, *args, max_tries=10, output_value=default, raise_exception=True, **kwargs
 ):
     """
-    Try to evaluate selected function a certain number of tries
+    Try to evaluate selected function a certain number of tries.
+    Failed http requests are retried with an exponential backoff (see config.HTTP_BACKOFF_FACTOR),
+    unless their status code shows that repeating them is useless.
     """
     out = None
     e = None
-    for _ in range(max_tries):
+    tries = 0
+    is_http = _is_http_function(func)
+    for attempt in range(max_tries):
+        tries = attempt + 1
+        start = time.perf_counter()
         try:
             out = func(*args, **kwargs)
         except Exception as exc:
             e = exc
+            if is_http:
+                if isinstance(exc, _FATAL_EXCEPTIONS):
+                    break
+                logger.debug("Request attempt %s failed: %s", attempt + 1, exc)
+                if attempt < max_tries - 1:
+                    time.sleep(_backoff(attempt))
             continue
         else:
-            if func in (
-                requests.post,
-                requests.get,
-                requests.put,
-                requests.patch,
-                requests.delete,
-            ):
+            e = None  # the error is given by the last response
+            if is_http:
                 if hasattr(out, "status_code"):
+                    logger.debug(
+                        "Request attempt %s to %s: status %s in %.3f s",
+                        attempt + 1,
+                        getattr(out, "url", None),
+                        out.status_code,
+                        time.perf_counter() - start,
+                    )
                     if out.status_code > 299:
-                        time.sleep(0.5)
+                        if out.status_code < 500 and out.status_code not in _RETRY_STATUS_CODES:
+                            break
+                        if attempt < max_tries - 1:
+                            time.sleep(_backoff(attempt, out))
                         continue
                     else:
                         return out if output_value == default else output_value
@@ -41,8 +123,10 @@ def retry_function(
             msg = e or out.text
         except Exception:
             msg = e or out
+        status = getattr(out, "status_code", None) if e is None else None
+        status = f" (status code {status})" if status is not None else ""
         raise Exception(
-            f"Selected function does not give any valid output after {max_tries} tries.\nError message: {msg}\n"
+            f"Selected function does not give any valid output after {tries} tries{status}.\nError message: {msg}\n"
         )
     else:
-        return out if output_value == default else output_value
\ No newline at end of file
+        return out if output_value == default else output_value